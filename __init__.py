@@ -1,5 +1 @@
-<<<<<<< HEAD
 """Backend package initialization."""
-=======
-"""Backend package initialization."""
->>>>>>> 7aac6aa8af60fdafa9102c534fae34a9b3c89f33
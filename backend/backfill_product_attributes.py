@@ -0,0 +1,51 @@
+from sqlalchemy import inspect, text
+from database import SessionLocal, engine
+import models, crud
+
+# One-shot backfill for the indexed product attributes: adds products.primary_image
+# if the table predates it, creates product_sizes and fills it from the
+# existing JSON column. Safe to re-run.
+
+BATCH_SIZE = 500
+
+def backfill():
+    columns = [c["name"] for c in inspect(engine).get_columns("products")]
+    if "primary_image" not in columns:
+        print("Adding products.primary_image...")
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE products ADD COLUMN primary_image VARCHAR(500) NULL"))
+    models.product_sizes.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        last_id, done = 0, 0
+        while True:
+            # Keyset batches so each batch is one indexed range scan
+            rows = (
+                db.query(models.Product.id, models.Product.images, models.Product.sizes)
+                .filter(models.Product.id > last_id)
+                .order_by(models.Product.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            for product_id, images, sizes in rows:
+                crud.sync_product_attributes(db, product_id, sizes or [])
+                db.query(models.Product).filter(models.Product.id == product_id).update(
+                    {models.Product.primary_image: images[0] if images else None}, synchronize_session=False
+                )
+            db.commit()
+            last_id = rows[-1][0]
+            done += len(rows)
+            print(f"Backfilled {done} products...")
+        print("Product attributes backfilled successfully!")
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,60 @@
+import statistics
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+import models
+
+# Helpers shared by the *_benchmark.py scripts that fill the database with
+# synthetic rows: batched order inserts tagged with a per-script customer
+# email (so cleanup never touches real orders), their deletion, median
+# timings and the --skip-insert/--keep flags.
+
+INSERT_BATCH = 10000
+
+def timed(fn, repeat: int):
+    """Run fn repeat times; return (median milliseconds, last result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+def insert_orders(db, orders: int, email: str, name: str, items: int = 0):
+    """Insert orders synthetic orders for email, each with items line items of the first product."""
+    product = None
+    if items:
+        product = db.query(models.Product.id, models.Product.price).first()
+        if product is None:
+            raise SystemExit("No products found; run seed_db.py first")
+    next_id = (db.execute(select(func.max(models.Order.id))).scalar() or 0) + 1
+    created_at = datetime(2024, 1, 1)
+    started = time.perf_counter()
+    for start in range(0, orders, INSERT_BATCH):
+        ids = range(next_id + start, next_id + min(start + INSERT_BATCH, orders))
+        db.execute(insert(models.Order), [{
+            "id": order_id, "customer_name": name, "customer_email": email,
+            "customer_phone": "0000000000", "address": "N/A", "city": "Quibdó", "postal_code": "270001",
+            "total_amount": product.price * items if product else 1000.0, "payment_method": "cash", "status": "paid",
+            "created_at": created_at + timedelta(seconds=order_id),
+        } for order_id in ids])
+        if product:
+            db.execute(insert(models.OrderItem), [{
+                "order_id": order_id, "product_id": product.id, "quantity": 1, "price": product.price, "size": "M",
+            } for order_id in ids for _ in range(items)])
+        db.commit()
+    print(f"Inserted {orders} orders" + (f" x {items} items" if items else "") +
+          f" in {time.perf_counter() - started:.1f}s")
+
+def delete_orders(db, email: str):
+    """Delete the synthetic orders inserted for email, with their line items."""
+    ids = select(models.Order.id).where(models.Order.customer_email == email)
+    db.query(models.OrderItem).filter(models.OrderItem.order_id.in_(ids)).delete(synchronize_session=False)
+    db.query(models.Order).filter(models.Order.customer_email == email).delete(synchronize_session=False)
+    db.commit()
+
+def add_data_args(parser, rows: str):
+    """Add --skip-insert and --keep for a benchmark that inserts synthetic rows."""
+    parser.add_argument("--skip-insert", action="store_true", help=f"reuse {rows} kept by a previous --keep run")
+    parser.add_argument("--keep", action="store_true", help=f"don't delete the synthetic {rows}")
@@ -0,0 +1,185 @@
+import hashlib
+import inspect
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from email.utils import formatdate
+from functools import wraps
+
+# In-process cache for catalog reads (products, categories, colors).
+# Entries are keyed by (namespace, *args) and evicted by TTL or LRU order.
+# Write paths in crud.py invalidate the namespaces they affect.
+
+CATALOG_CACHE_ENABLED = os.getenv("CATALOG_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "512"))
+# max-age for catalog responses; 0 means clients revalidate every time (cheap with ETags)
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "0"))
+# Admin order totals (X-Total-Count) are cached per filter set for this long
+ORDER_COUNT_TTL = float(os.getenv("ORDER_COUNT_TTL", "60"))
+
+_MISSING = object()
+
+def _freeze(value):
+    # Query parameters arrive as lists (color_ids, sizes); make them hashable
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+class TTLCache:
+    def __init__(self, maxsize: int = 512, ttl: float = 300, enabled: bool = True, aligned: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        # Expire entries at the end of the current ttl window (wall clock)
+        # instead of ttl after they were stored, matching CatalogVersion.etag
+        self.aligned = aligned
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a read that started before a write
+        # cannot store its (stale) result afterwards.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                self.evictions += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            ttl = self.ttl
+            if self.aligned and ttl > 0:
+                ttl -= time.time() % ttl
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *prefix):
+        """Drop every entry whose key starts with prefix (everything if empty)."""
+        with self._lock:
+            self.generation += 1
+            if not prefix:
+                self._data.clear()
+                return
+            n = len(prefix)
+            for key in [k for k in self._data if k[:n] == prefix]:
+                del self._data[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    @staticmethod
+    def key(namespace: str, *args, **kwargs):
+        return (namespace, *_freeze(args), _freeze(kwargs))
+
+    def cached(self, namespace: str, convert=None):
+        """Cache fn(db, *args, **kwargs) under (namespace, *args, kwargs).
+
+        convert turns the ORM result into plain objects (schemas) so nothing
+        tied to the request's session is kept; it runs whether or not the
+        cache is enabled so callers always get the same type back.
+        """
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                return self._cached_async(fn, namespace, convert)
+
+            @wraps(fn)
+            def wrapper(db, *args, **kwargs):
+                if not self.enabled:
+                    result = fn(db, *args, **kwargs)
+                    return convert(result) if convert else result
+                key = self.key(namespace, *args, **kwargs)
+                value = self.get(key)
+                if value is not _MISSING:
+                    return value
+                generation = self.generation
+                result = fn(db, *args, **kwargs)
+                value = convert(result) if convert else result
+                self.set(key, value, generation)
+                return value
+            return wrapper
+        return decorator
+
+    def _cached_async(self, fn, namespace: str, convert=None):
+        # Same as cached() for coroutine functions (the AsyncSession path)
+        @wraps(fn)
+        async def wrapper(db, *args, **kwargs):
+            if not self.enabled:
+                result = await fn(db, *args, **kwargs)
+                return convert(result) if convert else result
+            key = self.key(namespace, *args, **kwargs)
+            value = self.get(key)
+            if value is not _MISSING:
+                return value
+            generation = self.generation
+            result = await fn(db, *args, **kwargs)
+            value = convert(result) if convert else result
+            self.set(key, value, generation)
+            return value
+        return wrapper
+
+# Aligned with the ETag window, so another instance's write is picked up by
+# both the cached bodies and the validators within one CATALOG_CACHE_TTL
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL, enabled=CATALOG_CACHE_ENABLED, aligned=True)
+order_count_cache = TTLCache(maxsize=256, ttl=ORDER_COUNT_TTL, enabled=ORDER_COUNT_TTL > 0)
+
+class CatalogVersion:
+    """Monotonic version of the catalog, bumped by product/category/color writes.
+
+    Versions are only meaningful inside this process, so ETags also include a
+    per-process token (no false 304s across instances) and the current TTL
+    window. catalog_cache entries expire at the same window boundaries, so
+    another instance's write goes unnoticed for at most one TTL.
+    """
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL):
+        self.token = uuid.uuid4().hex[:12]
+        self.ttl = ttl
+        self.version = 0
+        self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self.updated_at = time.time()
+
+    def etag(self, resource: str) -> str:
+        window = int(time.time() // self.ttl) if self.ttl > 0 else 0
+        raw = f"{self.token}:{self.version}:{window}:{resource}"
+        return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+    def last_modified(self) -> str:
+        return formatdate(self.updated_at, usegmt=True)
+
+catalog_version = CatalogVersion()
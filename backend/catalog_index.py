@@ -0,0 +1,117 @@
+import threading
+import time
+import database, models, crud
+from cache import CATALOG_CACHE_TTL
+
+class CatalogIndex:
+    """In-memory index over the catalog products, kept current by crud.catalog_listeners.
+
+    Subclasses set their data attributes in _reset() and implement add(product)
+    and remove(product_id). The first refresh() builds the index synchronously.
+    Afterwards product writes are applied inline on the next refresh() (only
+    the dirty products are re-read), while a category change or an index older
+    than max_age (writes made by other instances are not notified here)
+    schedules a full rebuild on a background thread; readers keep using the
+    current index until the rebuilt one is swapped in.
+    """
+    def __init__(self, max_age: float = CATALOG_CACHE_TTL):
+        self.max_age = max_age
+        self._dirty = set()
+        self._stale = True
+        self._written = None  # products written while a rebuild reads the catalog
+        self.built_at = 0.0
+        self._lock = threading.RLock()
+        self._building = False
+        self._reset()
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def add(self, product):
+        raise NotImplementedError
+
+    def remove(self, product_id: int):
+        raise NotImplementedError
+
+    def on_catalog_change(self, kind: str, key=None):
+        with self._lock:
+            if kind == "product":
+                self._dirty.add(key)
+                if self._written is not None:
+                    self._written.add(key)
+            elif kind == "category":
+                self._stale = True
+
+    def _query(self, db):
+        return db.query(models.Product).options(*crud.PRODUCT_LOAD_OPTIONS)
+
+    def _expired(self):
+        return self._stale or time.time() - self.built_at > self.max_age
+
+    def rebuild(self):
+        """Build a new index from the database and swap it in."""
+        with self._lock:
+            self._stale = False
+            self._written = set()
+        # Only the attributes _reset() sets, so the swap below leaves the
+        # dirty set, lock and build state alone
+        fresh = object.__new__(type(self))
+        fresh._reset()
+        started = time.time()
+        db = database.SessionLocal()
+        try:
+            for product in self._query(db).all():
+                fresh.add(product)
+        except Exception:
+            with self._lock:
+                self._stale = True
+                self._written = None
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self.__dict__.update(fresh.__dict__)
+            self.built_at = started
+            # The rebuild may have read them before the write; apply them again
+            self._dirty |= self._written
+            self._written = None
+
+    def schedule(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            while self._expired():
+                self.rebuild()
+        finally:
+            with self._lock:
+                self._building = False
+
+    def refresh(self):
+        """Build on first use, schedule a rebuild once expired and apply pending product writes."""
+        if not self.built_at:
+            with self._lock:
+                if not self.built_at:
+                    self.rebuild()
+        elif self._expired():
+            self.schedule()
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            db = database.SessionLocal()
+            try:
+                for product_id in dirty:
+                    self.remove(product_id)
+                for product in self._query(db).filter(models.Product.id.in_(dirty)).all():
+                    self.add(product)
+            except Exception:
+                # Retry them on the next refresh
+                self._dirty |= dirty
+                raise
+            finally:
+                db.close()
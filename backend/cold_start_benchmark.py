@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures cold-start cost of the Vercel entry point (api/index.py): the time
+# to import it in a fresh interpreter and the latency of the first request
+# served by that process. Each run is a new process, like a cold lambda.
+#
+#   python cold_start_benchmark.py --runs 10 --path /api
+#   FAST_START=0 python cold_start_benchmark.py   # compare with create_all on import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child process; prints one JSON line with the timings
+CHILD = r"""
+import asyncio, json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from api.index import app
+imported = time.perf_counter()
+
+async def first_request(path):
+    status = {{}}
+    async def receive():
+        return {{"type": "http.request", "body": b"", "more_body": False}}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+    scope = {{
+        "type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }}
+    await app(scope, receive, send)
+    return status.get("code")
+
+code = asyncio.run(first_request({path!r}))
+done = time.perf_counter()
+print(json.dumps({{"import": imported - started, "first_request": done - imported, "status": code}}))
+"""
+
+def run_once(path: str):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=ROOT, path=path)],
+        capture_output=True, text=True, cwd=ROOT
+    )
+    if result.returncode != 0:
+        # e.g. FAST_START=0 without a reachable database
+        errors = result.stderr.strip().splitlines()
+        sys.exit(f"Child process failed: {errors[-1] if errors else result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def summary(values):
+    values = [v * 1000 for v in values]
+    return f"median={statistics.median(values):.1f}ms min={min(values):.1f}ms max={max(values):.1f}ms"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for api/index.py")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/api", help="path of the first request")
+    args = parser.parse_args()
+
+    results = [run_once(args.path) for _ in range(args.runs)]
+    print(f"FAST_START={os.getenv('FAST_START', '(default)')} runs={args.runs} path={args.path} status={results[-1]['status']}")
+    print(f"import:        {summary([r['import'] for r in results])}")
+    print(f"first request: {summary([r['first_request'] for r in results])}")
@@ -0,0 +1,184 @@
+import os
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+# Content-negotiated gzip/brotli compression for API responses.
+#
+# Small bodies are sent as-is. Complete bodies carrying an ETag are compressed
+# once and kept in compressed_cache keyed by (ETag, encoding), so repeated
+# catalog responses are not recompressed. Streaming responses are compressed
+# chunk by chunk without buffering the whole body. Responses that already
+# have a Content-Encoding (e.g. the precompressed catalog snapshot) pass
+# through untouched. Every response gets Vary: Accept-Encoding, compressed or
+# not, so shared caches never hand one client's encoding to another.
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+compressed_cache = TTLCache(maxsize=COMPRESSION_CACHE_SIZE, ttl=3600)
+
+def _choose_encoding(accept_encoding: str):
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def _vary_on_encoding(message):
+    """Add Accept-Encoding to the Vary header of a http.response.start message, once."""
+    headers = MutableHeaders(raw=message["headers"])
+    vary = [v.strip().lower() for v in headers.get("vary", "").split(",")]
+    if "accept-encoding" not in vary and "*" not in vary:
+        headers.add_vary_header("Accept-Encoding")
+    return headers
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor()
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    compressor = _Compressor(encoding)
+    return compressor.compress(body) + compressor.flush()
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_with_vary(message):
+                if message["type"] == "http.response.start":
+                    _vary_on_encoding(message)
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+        await _CompressedResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+class _CompressedResponder:
+    def __init__(self, app, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+        self.streaming = False
+        self.compressor = None
+        self.buffer = []
+        self.size = 0
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                _vary_on_encoding(message)
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.streaming:
+            chunk = self.compressor.compress(body)
+            if not more_body:
+                chunk += self.compressor.flush()
+            if chunk or not more_body:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        self.buffer.append(body)
+        self.size += len(body)
+        if more_body and self.size < self.minimum_size:
+            return  # keep buffering until we know whether it's worth compressing
+
+        if not more_body:
+            await self._send_complete(b"".join(self.buffer))
+            return
+
+        # Large streaming response: switch to incremental compression
+        self.streaming = True
+        self.compressor = _Compressor(self.encoding)
+        headers = self._compressed_headers()
+        del headers["content-length"]
+        await self.send(self.start_message)
+        chunk = self.compressor.compress(b"".join(self.buffer))
+        self.buffer = []
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    def _compressed_headers(self):
+        headers = _vary_on_encoding(self.start_message)
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            headers["ETag"] = etag[:-1] + f'-{self.encoding}"'
+        return headers
+
+    async def _send_complete(self, body: bytes):
+        if len(body) < self.minimum_size:
+            _vary_on_encoding(self.start_message)
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+        etag = Headers(raw=self.start_message["headers"]).get("etag")
+        key = (etag, self.encoding)
+        compressed = compressed_cache.get(key, None) if etag else None
+        if compressed is None:
+            compressed = compress_body(body, self.encoding)
+            if etag:
+                compressed_cache.set(key, compressed)
+        headers = self._compressed_headers()
+        headers["Content-Length"] = str(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
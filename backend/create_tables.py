@@ -0,0 +1,15 @@
+from database import get_engine
+import models
+
+# Creates any missing tables. With FAST_START (the default on Vercel) the API
+# no longer does this on import, so run it once per deploy / schema change:
+#
+#   python create_tables.py
+
+def create_tables():
+    engine = get_engine()
+    models.Base.metadata.create_all(bind=engine)
+    print(f"Tables ready: {', '.join(sorted(models.Base.metadata.tables))}")
+
+if __name__ == "__main__":
+    create_tables()
@@ -1,8 +1,108 @@
-from sqlalchemy.orm import Session
-import models, schemas
+from sqlalchemy import and_, case, exists, extract, func, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
+from typing import List
+import models, schemas, pagination
+from cache import catalog_cache, catalog_version, order_count_cache
+
+# Loader options so response_model serialization doesn't lazy-load per row (N+1).
+# category is many-to-one, so a JOIN doesn't multiply rows; colors and items are
+# collections and are fetched with one extra SELECT ... IN per page.
+PRODUCT_LOAD_OPTIONS = (
+    joinedload(models.Product.category),
+    selectinload(models.Product.colors),
+)
+ORDER_LOAD_OPTIONS = (
+    selectinload(models.Order.items),
+)
+# Order history also shows each item's product: one more IN query per page
+ORDER_HISTORY_LOAD_OPTIONS = (
+    selectinload(models.Order.items).selectinload(models.OrderItem.product).load_only(
+        models.Product.id, models.Product.name, models.Product.primary_image
+    ),
+)
+
+# Sparse fieldsets: fields a client may request with ?fields=, and the compact
+# representation used by product cards (?view=summary).
+PRODUCT_FIELDS = (
+    "id", "name", "description", "price", "original_price", "images", "primary_image",
+    "category_id", "sizes", "is_new", "is_sale", "features", "category", "colors",
+)
+SUMMARY_FIELDS = ("id", "name", "price", "original_price", "primary_image", "is_new", "is_sale", "category_id")
+_RELATION_LOADERS = {
+    "category": joinedload(models.Product.category),
+    "colors": selectinload(models.Product.colors),
+}
+
+def product_load_options(fields=None, sort_keys=()):
+    """Loader options selecting only the columns/relationships behind fields."""
+    if fields is None:
+        return PRODUCT_LOAD_OPTIONS
+    # The primary key and sort columns are always needed (identity map, cursors)
+    columns = {"id"} | {f for f in fields if f not in _RELATION_LOADERS} | {c.key for c, _ in sort_keys}
+    options = [load_only(*[getattr(models.Product, c) for c in sorted(columns)])]
+    options += [_RELATION_LOADERS[f] for f in fields if f in _RELATION_LOADERS]
+    return options
+
+def product_to_fields(product, fields):
+    data = {}
+    for field in fields:
+        if field == "category":
+            data[field] = schemas.Category.model_validate(product.category).model_dump() if product.category else None
+        elif field == "colors":
+            data[field] = [schemas.Color.model_validate(c).model_dump() for c in product.colors]
+        else:
+            data[field] = getattr(product, field)
+    return data
 
 def get_product(db: Session, product_id: int):
-    return db.query(models.Product).filter(models.Product.id == product_id).first()
+    return db.query(models.Product).options(*PRODUCT_LOAD_OPTIONS).filter(models.Product.id == product_id).first()
+
+# Catalog write hooks: every product/category/color write calls one of these
+# after committing so derived read state (cache, ETags) stays in sync.
+# Modules that keep their own derived structures register a callable here;
+# it receives ("product", product_id), ("category", None) or ("color", None).
+#
+# The version is bumped last: a reader that sees the new version (ETag) must
+# also find the stale cache entries gone and the listeners' dirty marks set,
+# otherwise the old body would be stored or served under the new validator.
+catalog_listeners = []
+
+def _notify(kind: str, key=None):
+    for listener in catalog_listeners:
+        listener(kind, key)
+
+# Cache namespaces holding product listings (any write may change any of them)
+PRODUCT_LIST_NAMESPACES = ("products", "product-pages", "product-fields", "product-field-pages")
+
+def product_changed(product_id: int):
+    for namespace in PRODUCT_LIST_NAMESPACES:
+        catalog_cache.invalidate(namespace)
+    catalog_cache.invalidate("product", product_id)
+    _notify("product", product_id)
+    catalog_version.bump()
+
+def categories_changed(rename: bool = False):
+    catalog_cache.invalidate("categories")
+    if rename:
+        # Products embed their category, so a rename touches every product entry
+        for namespace in PRODUCT_LIST_NAMESPACES:
+            catalog_cache.invalidate(namespace)
+        catalog_cache.invalidate("product")
+    _notify("category")
+    catalog_version.bump()
+
+def colors_changed():
+    catalog_cache.invalidate("colors")
+    _notify("color")
+    catalog_version.bump()
+
+def sync_product_attributes(db: Session, product_id: int, sizes: List[str]):
+    """Mirror the JSON sizes into the indexed product_sizes table."""
+    db.execute(models.product_sizes.delete().where(models.product_sizes.c.product_id == product_id))
+    unique_sizes = list(dict.fromkeys(sizes or []))
+    if unique_sizes:
+        db.execute(models.product_sizes.insert(), [{"product_id": product_id, "size": size} for size in unique_sizes])
 
 def update_product(db: Session, product_id: int, product: schemas.ProductCreate):
     db_product = get_product(db, product_id)
@@ -12,6 +112,7 @@ def update_product(db: Session, product_id: int, product: schemas.ProductCreate)
         db_product.price = product.price
         db_product.original_price = product.original_price
         db_product.images = product.images
+        db_product.primary_image = product.images[0] if product.images else None
         db_product.category_id = product.category_id
         db_product.sizes = product.sizes
         db_product.is_new = product.is_new
@@ -21,9 +122,12 @@ def update_product(db: Session, product_id: int, product: schemas.ProductCreate)
         # Always update colors, even if color_ids is an empty list
         colors = db.query(models.Color).filter(models.Color.id.in_(product.color_ids)).all()
         db_product.colors = colors
-            
+        db.flush()
+        sync_product_attributes(db, product_id, product.sizes)
+
         db.commit()
         db.refresh(db_product)
+        product_changed(product_id)
     return db_product
 
 def delete_product(db: Session, product_id: int):
@@ -32,20 +136,81 @@ def delete_product(db: Session, product_id: int):
         # Set product_id to null in order_items instead of deleting them or failing
         db.query(models.OrderItem).filter(models.OrderItem.product_id == product_id).update({models.OrderItem.product_id: None})
         
-        # Remove from many-to-many table (product_colors)
+        # Remove from many-to-many table (product_colors) and the size/stock tables
         db_product.colors = []
+        sync_product_attributes(db, product_id, [])
+        db.execute(models.product_stock.delete().where(models.product_stock.c.product_id == product_id))
         
         db.delete(db_product)
         db.commit()
+        product_changed(product_id)
         return True
     return False
 
-def get_products(db: Session, skip: int = 0, limit: int = 100, category: str = None):
-    query = db.query(models.Product)
+# Sort keys as (column, descending) pairs, always ending on the primary key so
+# keyset pagination has a stable tie-breaker.
+PRODUCT_SORTS = {
+    "price-asc": ((models.Product.price, False), (models.Product.id, False)),
+    "price-desc": ((models.Product.price, True), (models.Product.id, True)),
+    "newest": ((models.Product.is_new, True), (models.Product.id, True)),
+    "name": ((models.Product.name, False), (models.Product.id, False)),
+}
+DEFAULT_PRODUCT_SORT = ((models.Product.id, False),)
+ORDER_SORT = ((models.Order.created_at, True), (models.Order.id, True))
+USER_SORT = ((models.User.created_at, True), (models.User.id, True))
+
+def filter_products(query, category: str = None, color_ids: List[int] = None, sizes: List[str] = None,
+                    min_price: float = None, max_price: float = None,
+                    is_new: bool = None, is_sale: bool = None):
     if category and category != "Todos":
         query = query.join(models.Category).filter(models.Category.name == category)
+    if color_ids:
+        # Any of the selected colors, matching the storefront sidebar semantics
+        query = query.filter(models.Product.colors.any(models.Color.id.in_(color_ids)))
+    if sizes:
+        query = query.filter(exists().where(
+            models.product_sizes.c.product_id == models.Product.id,
+            models.product_sizes.c.size.in_(sizes)
+        ))
+    if min_price is not None:
+        query = query.filter(models.Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(models.Product.price <= max_price)
+    if is_new is not None:
+        query = query.filter(models.Product.is_new == is_new)
+    if is_sale is not None:
+        query = query.filter(models.Product.is_sale == is_sale)
+    return query
+
+def get_products(db: Session, skip: int = 0, limit: int = 100, category: str = None,
+                 color_ids: List[int] = None, sizes: List[str] = None,
+                 min_price: float = None, max_price: float = None,
+                 is_new: bool = None, is_sale: bool = None, sort: str = None, fields=None):
+    sort_keys = PRODUCT_SORTS.get(sort, DEFAULT_PRODUCT_SORT)
+    query = db.query(models.Product).options(*product_load_options(fields, sort_keys))
+    query = filter_products(query, category=category, color_ids=color_ids, sizes=sizes,
+                            min_price=min_price, max_price=max_price, is_new=is_new, is_sale=is_sale)
+    query = query.order_by(*pagination.order_by(sort_keys))
     return query.offset(skip).limit(limit).all()
 
+def get_products_by_ids(db: Session, product_ids: List[int]):
+    """Load products in one IN query, returned in the order of product_ids."""
+    if not product_ids:
+        return []
+    rows = db.query(models.Product).options(*PRODUCT_LOAD_OPTIONS).filter(models.Product.id.in_(product_ids)).all()
+    by_id = {p.id: p for p in rows}
+    return [by_id[i] for i in product_ids if i in by_id]
+
+def get_products_page(db: Session, cursor: str = None, limit: int = 100, category: str = None,
+                      color_ids: List[int] = None, sizes: List[str] = None,
+                      min_price: float = None, max_price: float = None,
+                      is_new: bool = None, is_sale: bool = None, sort: str = None, fields=None):
+    sort_keys = PRODUCT_SORTS.get(sort, DEFAULT_PRODUCT_SORT)
+    query = db.query(models.Product).options(*product_load_options(fields, sort_keys))
+    query = filter_products(query, category=category, color_ids=color_ids, sizes=sizes,
+                            min_price=min_price, max_price=max_price, is_new=is_new, is_sale=is_sale)
+    return pagination.paginate(query, sort_keys, cursor=cursor, limit=limit)
+
 def create_product(db: Session, product: schemas.ProductCreate):
     db_product = models.Product(
         name=product.name,
@@ -53,6 +218,7 @@ def create_product(db: Session, product: schemas.ProductCreate):
         price=product.price,
         original_price=product.original_price,
         images=product.images,
+        primary_image=product.images[0] if product.images else None,
         category_id=product.category_id,
         sizes=product.sizes,
         is_new=product.is_new,
@@ -64,13 +230,130 @@ def create_product(db: Session, product: schemas.ProductCreate):
         db_product.colors = colors
     
     db.add(db_product)
+    db.flush()
+    sync_product_attributes(db, db_product.id, product.sizes)
     db.commit()
     db.refresh(db_product)
+    product_changed(db_product.id)
     return db_product
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
-def create_order(db: Session, order: schemas.OrderCreate):
+# ORM bulk INSERT leaves None values out of each row by default, which splits
+# items with and without a size/color into separate statements; render_nulls
+# keeps every row the same shape so all items go in one multi-row INSERT.
+ORDER_ITEM_INSERT = insert(models.OrderItem).execution_options(render_nulls=True)
+
+def order_item_rows(order_id: int, items):
+    return [
+        dict(
+            order_id=order_id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price=item.price,
+            size=item.size,
+            color=item.color
+        )
+        for item in items
+    ]
+
+class OutOfStock(Exception):
+    """Some tracked variants don't have enough stock; nothing was reserved."""
+    def __init__(self, variants):
+        super().__init__("Out of stock")
+        self.variants = variants
+
+def get_stock(db: Session, product_id: int):
+    t = models.product_stock
+    rows = db.execute(select(t.c.size, t.c.color, t.c.quantity).where(t.c.product_id == product_id).order_by(t.c.size, t.c.color))
+    return [schemas.StockLevel(size=size or None, color=color or None, quantity=quantity) for size, color, quantity in rows]
+
+def set_stock(db: Session, product_id: int, levels: List[schemas.StockLevel]):
+    t = models.product_stock
+    db.execute(t.delete().where(t.c.product_id == product_id))
+    rows = {(level.size or "", level.color or ""): level.quantity for level in levels}
+    if rows:
+        db.execute(t.insert(), [
+            {"product_id": product_id, "size": size, "color": color, "quantity": quantity}
+            for (size, color), quantity in rows.items()
+        ])
+    db.commit()
+    return get_stock(db, product_id)
+
+def _variant_condition(product_id: int, size: str, color: str):
+    t = models.product_stock
+    return and_(t.c.product_id == product_id, t.c.size == size, t.c.color == color)
+
+def stock_demand(items):
+    """Requested quantity per distinct (product_id, size, color) variant, in primary key order."""
+    wanted = {}
+    for item in items:
+        variant = (item.product_id, item.size or "", item.color or "")
+        wanted[variant] = wanted.get(variant, 0) + item.quantity
+    return dict(sorted(wanted.items()))
+
+def stock_lock(variants):
+    # Locks the tracked rows among variants in primary key order, so
+    # concurrent checkouts queue up instead of deadlocking; variants without
+    # a row aren't tracked and simply don't come back.
+    t = models.product_stock
+    return (
+        select(t.c.product_id, t.c.size, t.c.color, t.c.quantity)
+        .where(tuple_(t.c.product_id, t.c.size, t.c.color).in_(list(variants)))
+        .order_by(t.c.product_id, t.c.size, t.c.color)
+        .with_for_update()
+    )
+
+def stock_decrement(demand):
+    """One UPDATE taking every variant's quantity; a row only matches while it has enough left."""
+    t = models.product_stock
+    amount = case(*[(_variant_condition(*variant), quantity) for variant, quantity in demand.items()])
+    return (
+        t.update()
+        .where(tuple_(t.c.product_id, t.c.size, t.c.color).in_(list(demand)), t.c.quantity >= amount)
+        .values(quantity=t.c.quantity - amount)
+    )
+
+def shortages(demand, rows):
+    return [
+        {"product_id": product_id, "size": size or None, "color": color or None,
+         "requested": demand[(product_id, size, color)], "available": quantity}
+        for product_id, size, color, quantity in rows
+        if quantity < demand[(product_id, size, color)]
+    ]
+
+def reserve_stock(db: Session, items):
+    """Take the order's stock: one locking SELECT, plus one UPDATE if any variant is tracked."""
+    demand = stock_demand(items)
+    if not demand:
+        return
+    rows = db.execute(stock_lock(demand)).all()
+    short = shortages(demand, rows)
+    if short:
+        raise OutOfStock(short)
+    tracked = {(product_id, size, color): demand[(product_id, size, color)] for product_id, size, color, _ in rows}
+    if tracked and db.execute(stock_decrement(tracked)).rowcount != len(tracked):
+        # Only reachable without row locks (SQLite): another checkout took the stock meanwhile
+        raise OutOfStock(shortages(demand, db.execute(stock_lock(demand)).all()))
+
+class DuplicateIdempotencyKey(Exception):
+    """Another request with the same Idempotency-Key committed its order first."""
+
+def get_idempotency_key(db: Session, key: str):
+    return db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == key).first()
+
+def store_idempotent_response(db: Session, key: str, db_order):
+    # Serialize once so replays return exactly this body without loading the order
+    result = schemas.Order.model_validate(db_order)
+    db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == key).update(
+        {models.IdempotencyKey.response: result.model_dump(mode="json")}, synchronize_session=False
+    )
+    db.commit()
+    return result
+
+def create_order(db: Session, order: schemas.OrderCreate, idempotency_key: str = None, request_hash: str = None):
+    # One transaction: the order row, then every item in a single bulk INSERT
+    # (no per-row primary key fetch), so a failure leaves no order without items.
     db_order = models.Order(
         customer_name=order.customer_name,
         customer_email=order.customer_email,
@@ -81,35 +364,81 @@ def create_order(db: Session, order: schemas.OrderCreate):
         total_amount=order.total_amount,
         payment_method=order.payment_method,
         user_id=order.user_id,
-        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        created_at=datetime.now()
     )
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-
-    for item in order.items:
-        db_item = models.OrderItem(
-            order_id=db_order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            price=item.price,
-            size=item.size,
-            color=item.color
-        )
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_order)
+    try:
+        db.add(db_order)
+        db.flush()
+        order_id = db_order.id  # read before commit expires it
+        if idempotency_key:
+            # A concurrent request with the same key blocks on the unique index
+            # here until this transaction ends, then fails instead of duplicating.
+            db.add(models.IdempotencyKey(key=idempotency_key, request_hash=request_hash, order_id=order_id))
+            try:
+                db.flush()
+            except IntegrityError:
+                db.rollback()
+                raise DuplicateIdempotencyKey(idempotency_key)
+        reserve_stock(db, order.items)
+        if order.items:
+            db.execute(ORDER_ITEM_INSERT, order_item_rows(order_id, order.items))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # Single reload with the items eagerly loaded for the response
+    db_order = get_order(db, order_id)
+    if idempotency_key:
+        return store_idempotent_response(db, idempotency_key, db_order)
     return db_order
 
-def get_user_orders(db: Session, user_id: str):
-    return db.query(models.Order).filter(models.Order.user_id == user_id).order_by(models.Order.created_at.desc()).all()
+def get_user_orders_page(db: Session, user_id: str, cursor: str = None, limit: int = 20):
+    # Served by ix_orders_user_created_at (user_id, created_at, id); 3 queries per page
+    query = db.query(models.Order).options(*ORDER_HISTORY_LOAD_OPTIONS).filter(models.Order.user_id == user_id)
+    return pagination.paginate(query, ORDER_SORT, cursor=cursor, limit=limit)
 
 def get_order(db: Session, order_id: int):
-    return db.query(models.Order).filter(models.Order.id == order_id).first()
+    return db.query(models.Order).options(*ORDER_LOAD_OPTIONS).filter(models.Order.id == order_id).first()
 
-def get_all_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Order).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+def filter_orders(query, status: str = None, payment_method: str = None,
+                  date_from: date = None, date_to: date = None, city: str = None, q: str = None):
+    # Each filter has an index leading with its column (models.Order); the
+    # date range alone is served by ix_orders_created_at_id.
+    if status:
+        query = query.filter(models.Order.status == status)
+    if payment_method:
+        query = query.filter(models.Order.payment_method == payment_method)
+    if city:
+        query = query.filter(models.Order.city == city)
+    if date_from:
+        query = query.filter(models.Order.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        # Inclusive: the whole of date_to
+        query = query.filter(models.Order.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if q:
+        # Prefix matches only (LIKE 'q%'), which can use the email/name indexes
+        prefix = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        matches = [
+            models.Order.customer_email.like(prefix, escape="\\"),
+            models.Order.customer_name.like(prefix, escape="\\"),
+        ]
+        if q.isdigit():
+            matches.append(models.Order.id == int(q))
+        query = query.filter(or_(*matches))
+    return query
+
+def get_all_orders(db: Session, skip: int = 0, limit: int = 100, **filters):
+    query = filter_orders(db.query(models.Order).options(*ORDER_LOAD_OPTIONS), **filters)
+    return query.order_by(*pagination.order_by(ORDER_SORT)).offset(skip).limit(limit).all()
+
+def get_all_orders_page(db: Session, cursor: str = None, limit: int = 100, **filters):
+    query = filter_orders(db.query(models.Order).options(*ORDER_LOAD_OPTIONS), **filters)
+    return pagination.paginate(query, ORDER_SORT, cursor=cursor, limit=limit)
+
+@order_count_cache.cached("order-count")
+def count_orders(db: Session, **filters):
+    """Number of orders matching filters; cached for ORDER_COUNT_TTL, so it may lag new orders."""
+    return filter_orders(db.query(func.count(models.Order.id)), **filters).scalar()
 
 def update_order_status(db: Session, order_id: int, status: str):
     db_order = get_order(db, order_id)
@@ -117,10 +446,75 @@ def update_order_status(db: Session, order_id: int, status: str):
         db_order.status = status
         db.commit()
         db.refresh(db_order)
+        # Status filters count differently now
+        order_count_cache.invalidate("order-count")
     return db_order
 
+# Statuses an order may move to from each status; delivered and cancelled are final.
+# Cash on delivery orders go straight from pending to shipped/delivered.
+ORDER_TRANSITIONS = {
+    "pending": ("paid", "shipped", "delivered", "cancelled"),
+    "paid": ("shipped", "delivered", "cancelled"),
+    "shipped": ("delivered", "cancelled"),
+    "delivered": (),
+    "cancelled": (),
+}
+BULK_STATUS_MAX = 1000
+
+class TooManyOrders(ValueError):
+    pass
+
+def bulk_update_order_status(db: Session, new_status: str, ids: List[int] = None, filters: dict = None):
+    """Move the orders in ids (or matching filters, see filter_orders) to new_status with one UPDATE.
+
+    Returns (id, result, status) per order, result being "updated",
+    "unchanged" (already in new_status), "invalid_transition" (status is
+    the current one) or "not_found". The matched rows are locked first so the
+    results agree with what the UPDATE changed. Raises TooManyOrders when
+    more than BULK_STATUS_MAX orders would be touched.
+    """
+    # Rows are locked in id order, like stock_lock, so concurrent bulk updates can't deadlock
+    query = db.query(models.Order.id, models.Order.status).order_by(models.Order.id)
+    if ids is not None:
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > BULK_STATUS_MAX:
+            raise TooManyOrders(f"At most {BULK_STATUS_MAX} orders per request")
+        query = query.filter(models.Order.id.in_(ids))
+    else:
+        query = filter_orders(query, **(filters or {})).limit(BULK_STATUS_MAX + 1)
+    try:
+        current = dict(query.with_for_update().all())
+        if len(current) > BULK_STATUS_MAX:
+            raise TooManyOrders(f"More than {BULK_STATUS_MAX} orders match; narrow the filter")
+
+        sources = [source for source, targets in ORDER_TRANSITIONS.items() if new_status in targets]
+        movable = [order_id for order_id, old in current.items() if old in sources]
+        if movable:
+            db.query(models.Order).filter(
+                models.Order.id.in_(movable), models.Order.status.in_(sources)
+            ).update({models.Order.status: new_status}, synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if movable:
+        order_count_cache.invalidate("order-count")
+
+    results = []
+    for order_id in (ids if ids is not None else current):
+        old = current.get(order_id)
+        if old is None:
+            results.append((order_id, "not_found", None))
+        elif old == new_status:
+            results.append((order_id, "unchanged", old))
+        elif old in sources:
+            results.append((order_id, "updated", new_status))
+        else:
+            results.append((order_id, "invalid_transition", old))
+    return results
+
 def record_visit(db: Session, ip_address: str):
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = date.today()
     # Check if this IP already visited today
     existing_visit = db.query(models.Visitor).filter(
         models.Visitor.ip_address == ip_address,
@@ -145,22 +539,24 @@ def get_admin_stats(db: Session):
     visitors_count = db.query(models.Visitor).count()
     
     # Get recent orders
-    recent_orders = db.query(models.Order).order_by(models.Order.created_at.desc()).limit(5).all()
+    recent_orders = db.query(models.Order).options(*ORDER_LOAD_OPTIONS).order_by(*pagination.order_by(ORDER_SORT)).limit(5).all()
     
-    # Calculate sales activity (simplified monthly revenue for the current year)
-    # In a real app, this would use SQL grouping, but for SQLite/Small data we can do it in Python
+    # Monthly revenue for the current year, grouped in SQL over the created_at range
     sales_activity = [0] * 12
     current_year = datetime.now().year
-    
-    all_orders = db.query(models.Order).filter(models.Order.status != 'cancelled').all()
-    for order in all_orders:
-        try:
-            # order.created_at format: "%Y-%m-%d %H:%M:%S"
-            dt = datetime.strptime(order.created_at, "%Y-%m-%d %H:%M:%S")
-            if dt.year == current_year:
-                sales_activity[dt.month - 1] += order.total_amount
-        except:
-            continue
+    month = extract("month", models.Order.created_at)
+    monthly = (
+        db.query(month, func.sum(models.Order.total_amount))
+        .filter(
+            models.Order.status != 'cancelled',
+            models.Order.created_at >= datetime(current_year, 1, 1),
+            models.Order.created_at < datetime(current_year + 1, 1, 1),
+        )
+        .group_by(month)
+        .all()
+    )
+    for month_number, total in monthly:
+        sales_activity[int(month_number) - 1] = total or 0
             
     return {
         "revenue": revenue,
@@ -179,6 +575,7 @@ def create_category(db: Session, category: schemas.CategoryCreate):
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    categories_changed()
     return db_category
 
 def update_category(db: Session, category_id: int, category: schemas.CategoryCreate):
@@ -187,6 +584,7 @@ def update_category(db: Session, category_id: int, category: schemas.CategoryCre
         db_category.name = category.name
         db.commit()
         db.refresh(db_category)
+        categories_changed(rename=True)
     return db_category
 
 def delete_category(db: Session, category_id: int):
@@ -198,6 +596,7 @@ def delete_category(db: Session, category_id: int):
             return False, "Cannot delete category with associated products"
         db.delete(db_category)
         db.commit()
+        categories_changed()
         return True, "Category deleted successfully"
     return False, "Category not found"
 
@@ -209,7 +608,98 @@ def create_color(db: Session, color: schemas.ColorCreate):
     db.add(db_color)
     db.commit()
     db.refresh(db_color)
+    colors_changed()
     return db_color
 
 def get_all_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).order_by(models.User.created_at.desc()).offset(skip).limit(limit).all()
+    return db.query(models.User).order_by(*pagination.order_by(USER_SORT)).offset(skip).limit(limit).all()
+
+def get_all_users_page(db: Session, cursor: str = None, limit: int = 100):
+    return pagination.paginate(db.query(models.User), USER_SORT, cursor=cursor, limit=limit)
+
+# Cached catalog reads used by the public endpoints. Results are converted to
+# schemas so cached values don't hold on to the request's session.
+def _products_to_schema(products):
+    return [schemas.Product.model_validate(p) for p in products]
+
+def _page_to_schema(page):
+    return page._replace(items=_products_to_schema(page.items))
+
+def _product_to_schema(product):
+    return schemas.Product.model_validate(product) if product else None
+
+@catalog_cache.cached("products", _products_to_schema)
+def get_products_cached(db: Session, **filters):
+    return get_products(db, **filters)
+
+@catalog_cache.cached("product-pages", _page_to_schema)
+def get_products_page_cached(db: Session, **filters):
+    return get_products_page(db, **filters)
+
+# product_id must stay positional: it is part of the key that product_changed() drops
+@catalog_cache.cached("product", _product_to_schema)
+def get_product_cached(db: Session, product_id: int):
+    return get_product(db, product_id)
+
+# Sparse reads return plain dicts with only the requested fields
+@catalog_cache.cached("product-fields")
+def get_products_fields_cached(db: Session, fields, **filters):
+    return [product_to_fields(p, fields) for p in get_products(db, fields=fields, **filters)]
+
+@catalog_cache.cached("product-field-pages")
+def get_products_page_fields_cached(db: Session, fields, **filters):
+    page = get_products_page(db, fields=fields, **filters)
+    return page._replace(items=[product_to_fields(p, fields) for p in page.items])
+
+@catalog_cache.cached("product")
+def get_product_fields_cached(db: Session, product_id: int, fields):
+    product = db.query(models.Product).options(*product_load_options(fields)).filter(models.Product.id == product_id).first()
+    return product_to_fields(product, fields) if product else None
+
+_NOT_CACHED = object()
+
+def lookup_cached_products(product_ids: List[int]):
+    """Split product_ids into cached schemas and ids still to load.
+
+    Returns (found, to_load, generation); pass them to store_loaded_products()
+    together with the products loaded for to_load.
+    """
+    found, to_load = {}, []
+    generation = catalog_cache.generation
+    for product_id in dict.fromkeys(product_ids):
+        value = _NOT_CACHED
+        if catalog_cache.enabled:
+            value = catalog_cache.get(catalog_cache.key("product", product_id), _NOT_CACHED)
+        if value is _NOT_CACHED:
+            to_load.append(product_id)
+        elif value is not None:  # None is a cached "not found"
+            found[product_id] = value
+    return found, to_load, generation
+
+def store_loaded_products(product_ids: List[int], found, to_load, loaded, generation: int):
+    for product in loaded:
+        found[product.id] = _product_to_schema(product)
+    if catalog_cache.enabled:
+        for product_id in to_load:
+            catalog_cache.set(catalog_cache.key("product", product_id), found.get(product_id), generation)
+    products = [found[i] for i in product_ids if i in found]
+    missing = [i for i in dict.fromkeys(product_ids) if i not in found]
+    return products, missing
+
+def get_products_by_ids_cached(db: Session, product_ids: List[int]):
+    """Batch version of get_product_cached sharing its entries.
+
+    Ids already cached are served from memory and the rest are loaded in one
+    IN query. Returns (products in requested order, missing ids).
+    """
+    found, to_load, generation = lookup_cached_products(product_ids)
+    loaded = get_products_by_ids(db, to_load) if to_load else []
+    return store_loaded_products(product_ids, found, to_load, loaded, generation)
+
+@catalog_cache.cached("categories", lambda rows: [schemas.Category.model_validate(c) for c in rows])
+def get_categories_cached(db: Session):
+    return get_categories(db)
+
+@catalog_cache.cached("colors", lambda rows: [schemas.Color.model_validate(c) for c in rows])
+def get_colors_cached(db: Session):
+    return get_colors(db)
@@ -0,0 +1,112 @@
+from datetime import date
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import models, schemas, pagination, crud
+from cache import catalog_cache
+
+# AsyncSession versions of the hot crud functions, used when DB_ASYNC=1.
+#
+# Query building (filters, sorts, loader options) is shared with crud.py and
+# only execution is awaited. Every relationship a response touches must be
+# eager-loaded here: lazy loads are not possible on an AsyncSession. The
+# cached wrappers use the same namespaces as crud's, so both paths share
+# entries and the write hooks invalidate them alike.
+
+def _product_select(fields=None, sort_keys=()):
+    return select(models.Product).options(*crud.product_load_options(fields, sort_keys))
+
+async def get_product(db: AsyncSession, product_id: int, fields=None):
+    result = await db.execute(_product_select(fields).where(models.Product.id == product_id))
+    return result.scalars().first()
+
+async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100, category: str = None,
+                       color_ids: List[int] = None, sizes: List[str] = None,
+                       min_price: float = None, max_price: float = None,
+                       is_new: bool = None, is_sale: bool = None, sort: str = None, fields=None):
+    sort_keys = crud.PRODUCT_SORTS.get(sort, crud.DEFAULT_PRODUCT_SORT)
+    stmt = crud.filter_products(_product_select(fields, sort_keys), category=category, color_ids=color_ids, sizes=sizes,
+                                min_price=min_price, max_price=max_price, is_new=is_new, is_sale=is_sale)
+    stmt = stmt.order_by(*pagination.order_by(sort_keys)).offset(skip).limit(limit)
+    return (await db.execute(stmt)).scalars().all()
+
+async def get_products_page(db: AsyncSession, cursor: str = None, limit: int = 100, category: str = None,
+                            color_ids: List[int] = None, sizes: List[str] = None,
+                            min_price: float = None, max_price: float = None,
+                            is_new: bool = None, is_sale: bool = None, sort: str = None, fields=None):
+    sort_keys = crud.PRODUCT_SORTS.get(sort, crud.DEFAULT_PRODUCT_SORT)
+    stmt = crud.filter_products(_product_select(fields, sort_keys), category=category, color_ids=color_ids, sizes=sizes,
+                                min_price=min_price, max_price=max_price, is_new=is_new, is_sale=is_sale)
+    return await pagination.paginate_async(db, stmt, sort_keys, cursor=cursor, limit=limit)
+
+async def get_products_by_ids(db: AsyncSession, product_ids: List[int]):
+    if not product_ids:
+        return []
+    result = await db.execute(_product_select().where(models.Product.id.in_(product_ids)))
+    by_id = {p.id: p for p in result.scalars().all()}
+    return [by_id[i] for i in product_ids if i in by_id]
+
+async def get_order(db: AsyncSession, order_id: int):
+    result = await db.execute(
+        select(models.Order).options(*crud.ORDER_LOAD_OPTIONS)
+        .where(models.Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_idempotency_key(db: AsyncSession, key: str):
+    result = await db.execute(select(models.IdempotencyKey).where(models.IdempotencyKey.key == key))
+    return result.scalars().first()
+
+async def create_order(db: AsyncSession, order: schemas.OrderCreate, idempotency_key: str = None, request_hash: str = None):
+    # The order transaction (idempotency key, stock, bulk item insert) is
+    # crud.create_order itself, run on this session's connection: run_sync
+    # hands it a Session whose statements go through the async driver
+    return await db.run_sync(crud.create_order, order, idempotency_key, request_hash)
+
+async def record_visit(db: AsyncSession, ip_address: str):
+    today = date.today()
+    result = await db.execute(
+        select(models.Visitor.id).where(
+            models.Visitor.ip_address == ip_address,
+            models.Visitor.visit_date == today
+        ).limit(1)
+    )
+    if result.first() is None:
+        db.add(models.Visitor(ip_address=ip_address, visit_date=today))
+        await db.commit()
+        return True
+    return False
+
+# Cached catalog reads, sharing namespaces and conversions with crud.py
+@catalog_cache.cached("products", crud._products_to_schema)
+async def get_products_cached(db: AsyncSession, **filters):
+    return await get_products(db, **filters)
+
+@catalog_cache.cached("product-pages", crud._page_to_schema)
+async def get_products_page_cached(db: AsyncSession, **filters):
+    return await get_products_page(db, **filters)
+
+# product_id must stay positional: it is part of the key that product_changed() drops
+@catalog_cache.cached("product", crud._product_to_schema)
+async def get_product_cached(db: AsyncSession, product_id: int):
+    return await get_product(db, product_id)
+
+@catalog_cache.cached("product-fields")
+async def get_products_fields_cached(db: AsyncSession, fields, **filters):
+    return [crud.product_to_fields(p, fields) for p in await get_products(db, fields=fields, **filters)]
+
+@catalog_cache.cached("product-field-pages")
+async def get_products_page_fields_cached(db: AsyncSession, fields, **filters):
+    page = await get_products_page(db, fields=fields, **filters)
+    return page._replace(items=[crud.product_to_fields(p, fields) for p in page.items])
+
+@catalog_cache.cached("product")
+async def get_product_fields_cached(db: AsyncSession, product_id: int, fields):
+    product = await get_product(db, product_id, fields)
+    return crud.product_to_fields(product, fields) if product else None
+
+async def get_products_by_ids_cached(db: AsyncSession, product_ids: List[int]):
+    found, to_load, generation = crud.lookup_cached_products(product_ids)
+    loaded = await get_products_by_ids(db, to_load) if to_load else []
+    return crud.store_loaded_products(product_ids, found, to_load, loaded, generation)
@@ -1,7 +1,11 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,13 +26,217 @@ if os.getenv("VERCEL") or DB_HOST == "localhost":
 # La URL de conexión
 SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-# Para MySQL en producción, añadimos pool_pre_ping para evitar conexiones muertas
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool de conexiones configurable. Conviene que DB_POOL_SIZE + DB_MAX_OVERFLOW
+# cubra los hilos del threadpool que pueden usar la DB a la vez (40 por defecto).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+# Estrategia de pre-ping: "always" (un SELECT 1 en cada checkout), "idle" (solo
+# si la conexión lleva más de DB_POOL_PING_IDLE segundos sin usarse) u "off"
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always").lower()
+DB_POOL_PING_IDLE = float(os.getenv("DB_POOL_PING_IDLE", "30"))
+
+class PoolMetrics:
+    """Contadores del pool: espera en checkout, timeouts y latencia de conexión."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def connect_started(self):
+        self._local.connect_started = time.perf_counter()
+
+    def connect_finished(self):
+        started = getattr(self._local, "connect_started", None)
+        if started is None:
+            return
+        self._local.connect_started = None
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self.connects += 1
+            self.connect_total += seconds
+            self.connect_max = max(self.connect_max, seconds)
+
+    def record_ping(self, ok: bool):
+        with self._lock:
+            self.pings += 1
+            if not ok:
+                self.ping_failures += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "connect_avg_ms": round(self.connect_total / self.connects * 1000, 3) if self.connects else 0.0,
+                "connect_max_ms": round(self.connect_max * 1000, 3),
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+            }
+
+pool_metrics = PoolMetrics()
+# El engine asíncrono tiene su propio pool, así que sus métricas van aparte
+async_pool_metrics = PoolMetrics()
+
+class _MeteredPool:
+    # El tiempo de espera incluye abrir una conexión nueva cuando el pool aún
+    # no está lleno; connect_avg_ms permite separar las dos partes.
+    metrics = pool_metrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    pass
+
+class MeteredAsyncQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    # El checkout corre dentro del greenlet, así que la espera se mide igual
+    metrics = async_pool_metrics
+
+def _install_pool_events(engine, ping_idle: bool):
+    metrics = engine.pool.metrics
+
+    @event.listens_for(engine, "do_connect")
+    def _connect_started(dialect, conn_rec, cargs, cparams):
+        metrics.connect_started()
+
+    @event.listens_for(engine.pool, "connect")
+    def _connect_finished(dbapi_connection, connection_record):
+        metrics.connect_finished()
+
+    if not ping_idle:
+        return
+
+    @event.listens_for(engine.pool, "checkin")
+    def _checked_in(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.pool, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < DB_POOL_PING_IDLE:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            metrics.record_ping(True)
+        except Exception:
+            metrics.record_ping(False)
+            # El pool descarta esta conexión y reintenta con una nueva
+            raise DisconnectionError()
+        finally:
+            cursor.close()
+
+# El engine se crea en el primer uso y no al importar: así un arranque en frío
+# (Vercel) no paga la carga del driver ni del dialecto hasta la primera consulta
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(
+                SQLALCHEMY_DATABASE_URL,
+                poolclass=MeteredQueuePool,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_pre_ping=DB_POOL_PRE_PING == "always",
+                pool_recycle=DB_POOL_RECYCLE
+            )
+            _install_pool_events(_engine, ping_idle=DB_POOL_PRE_PING == "idle")
+        return _engine
+
+def __getattr__(name):
+    # Compatibilidad con "from database import engine"
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LazySession(Session):
+    # Sin bind explícito, la sesión usa el engine perezoso
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None:
+            return get_engine()
+        return super().get_bind(mapper, **kwargs)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, class_=LazySession)
+
+# Ruta asíncrona opcional (DB_ASYNC=1): AsyncSession sobre aiomysql para las
+# rutas más usadas, sin ocupar un hilo del threadpool mientras espera a MySQL
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() not in ("0", "false", "no")
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=MeteredAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING == "always",
+        pool_recycle=DB_POOL_RECYCLE
+    )
+    # Los eventos del pool van sobre el engine síncrono interno; el checkout
+    # corre dentro del greenlet, así que el SELECT 1 de "idle" funciona igual
+    _install_pool_events(async_engine.sync_engine, ping_idle=DB_POOL_PRE_PING == "idle")
+    # expire_on_commit=False: los objetos se serializan después del commit
+    # y en asyncio no se pueden recargar de forma perezosa
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def pool_stats():
+    """Estado del pool (conexiones en uso, overflow) junto con sus métricas."""
+    def status(pool):
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": DB_POOL_TIMEOUT,
+        }
+    stats = {
+        "pre_ping": DB_POOL_PRE_PING,
+        "recycle": DB_POOL_RECYCLE,
+        "pool": status(get_engine().pool),
+        "metrics": pool_metrics.snapshot(),
+    }
+    if async_engine is not None:
+        stats["async_pool"] = status(async_engine.pool)
+        stats["async_metrics"] = async_pool_metrics.snapshot()
+    return stats
 
 Base = declarative_base()
 
@@ -38,4 +246,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
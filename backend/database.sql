@@ -19,22 +19,45 @@ CREATE TABLE IF NOT EXISTS products (
     price FLOAT NOT NULL,
     original_price FLOAT,
     images JSON,
+    primary_image VARCHAR(500),
     category_id INT,
     sizes JSON,
     is_new BOOLEAN DEFAULT FALSE,
     is_sale BOOLEAN DEFAULT FALSE,
     features JSON,
-    FOREIGN KEY (category_id) REFERENCES categories(id)
+    FOREIGN KEY (category_id) REFERENCES categories(id),
+    INDEX ix_products_category_id (category_id),
+    INDEX ix_products_price (price),
+    INDEX ix_products_is_new (is_new),
+    INDEX ix_products_is_sale (is_sale)
 );
 
 CREATE TABLE IF NOT EXISTS product_colors (
     product_id INT,
     color_id INT,
     PRIMARY KEY (product_id, color_id),
+    INDEX ix_product_colors_color_product (color_id, product_id),
     FOREIGN KEY (product_id) REFERENCES products(id),
     FOREIGN KEY (color_id) REFERENCES colors(id)
 );
 
+CREATE TABLE IF NOT EXISTS product_sizes (
+    product_id INT,
+    size VARCHAR(20),
+    PRIMARY KEY (product_id, size),
+    INDEX ix_product_sizes_size_product (size, product_id),
+    FOREIGN KEY (product_id) REFERENCES products(id)
+);
+
+CREATE TABLE IF NOT EXISTS product_stock (
+    product_id INT NOT NULL,
+    size VARCHAR(20) NOT NULL DEFAULT '',
+    color VARCHAR(50) NOT NULL DEFAULT '',
+    quantity INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, size, color),
+    FOREIGN KEY (product_id) REFERENCES products(id)
+);
+
 CREATE TABLE IF NOT EXISTS orders (
     id INT AUTO_INCREMENT PRIMARY KEY,
     customer_name VARCHAR(100) NOT NULL,
@@ -46,8 +69,15 @@ CREATE TABLE IF NOT EXISTS orders (
     total_amount FLOAT NOT NULL,
     payment_method VARCHAR(50),
     status VARCHAR(50) DEFAULT 'pending',
-    created_at VARCHAR(50),
-    user_id VARCHAR(100)
+    created_at DATETIME,
+    user_id VARCHAR(100),
+    INDEX ix_orders_created_at_id (created_at, id),
+    INDEX ix_orders_user_created_at (user_id, created_at, id),
+    INDEX ix_orders_customer_email (customer_email),
+    INDEX ix_orders_status_created_at (status, created_at, id),
+    INDEX ix_orders_payment_created_at (payment_method, created_at, id),
+    INDEX ix_orders_city_created_at (city, created_at, id),
+    INDEX ix_orders_customer_name (customer_name)
 );
 
 CREATE TABLE IF NOT EXISTS order_items (
@@ -65,7 +95,19 @@ CREATE TABLE IF NOT EXISTS order_items (
 CREATE TABLE IF NOT EXISTS visitors (
     id INT AUTO_INCREMENT PRIMARY KEY,
     ip_address VARCHAR(50),
-    visit_date VARCHAR(20),
-    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    visit_date DATE,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_visitors_ip_date (ip_address, visit_date)
+);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    `key` VARCHAR(100) NOT NULL,
+    request_hash VARCHAR(64) NOT NULL,
+    order_id INT,
+    response JSON,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE INDEX ux_idempotency_keys_key (`key`),
+    FOREIGN KEY (order_id) REFERENCES orders(id)
 );
 
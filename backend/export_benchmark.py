@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from database import SessionLocal
+from benchmark_utils import insert_orders, delete_orders, add_data_args
+
+# Memory benchmark for the streaming order export (order_export.py): inserts
+# --orders synthetic orders with --items line items each, exports them in a
+# fresh process and checks that its peak RSS grew by less than --rss-mb
+# while doing it. The synthetic orders are deleted at the end (--keep to
+# reuse them on the next run with --skip-insert).
+#
+#   python export_benchmark.py --orders 1000000 --format csv --rss-mb 100
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+EMAIL = "export-benchmark@example.com"
+
+# Runs inside the child process; prints one JSON line with the measurements
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {backend!r})
+from order_export import EXPORT_FORMATS
+import database
+database.get_engine().connect().close()
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+stream, _ = EXPORT_FORMATS[{format!r}]
+started = time.perf_counter()
+size = lines = 0
+for chunk in stream(q={email!r}):
+    size += len(chunk.encode())
+    lines += chunk.count("\n")
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"baseline_kb": baseline, "peak_kb": peak, "bytes": size, "lines": lines, "seconds": elapsed}}))
+"""
+
+def export(format: str):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(backend=BACKEND, format=format, email=EMAIL)],
+        capture_output=True, text=True, cwd=BACKEND
+    )
+    if result.returncode != 0:
+        errors = result.stderr.strip().splitlines()
+        sys.exit(f"Export process failed: {errors[-1] if errors else result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def run(orders: int, items: int, format: str, rss_mb: float, skip_insert: bool, keep: bool):
+    db = SessionLocal()
+    try:
+        if not skip_insert:
+            insert_orders(db, orders, EMAIL, "Export Benchmark", items=items)
+        stats = export(format)
+        growth = (stats["peak_kb"] - stats["baseline_kb"]) / 1024
+        print(f"{format}: {stats['lines']} lines, {stats['bytes'] / 1024 / 1024:.1f} MB in {stats['seconds']:.1f}s "
+              f"({stats['bytes'] / 1024 / 1024 / stats['seconds']:.1f} MB/s)")
+        print(f"RSS: baseline={stats['baseline_kb'] / 1024:.1f} MB peak={stats['peak_kb'] / 1024:.1f} MB "
+              f"growth={growth:.1f} MB (budget {rss_mb:.0f} MB)")
+        ok = growth <= rss_mb
+        print("OK: memory stayed within budget" if ok else "FAILED: export memory grew past the budget")
+        return ok
+    finally:
+        if not keep:
+            delete_orders(db, EMAIL)
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming order export memory benchmark")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--items", type=int, default=2, help="line items per order")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--rss-mb", type=float, default=100, help="allowed peak RSS growth during the export")
+    add_data_args(parser, "orders")
+    args = parser.parse_args()
+    if not run(args.orders, args.items, args.format, args.rss_mb, args.skip_insert, args.keep):
+        sys.exit(1)
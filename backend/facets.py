@@ -0,0 +1,160 @@
+import bisect
+from collections import defaultdict
+import crud
+from catalog_index import CatalogIndex
+
+# Facet counts for the product listing sidebar, served from in-memory bitmaps.
+#
+# Every facet value (category, color, size, new/sale flag, price bucket) keeps
+# a Python int used as a bitset over product ids. Counting the products that
+# match the current selection is then a handful of ANDs/ORs and bit_count()
+# calls instead of a scan of products and its JSON sizes column. Each facet
+# is counted against every *other* active filter, so the sidebar shows how
+# many results picking that value would give.
+
+# Lower edges of the price buckets; the last bucket is open-ended
+PRICE_EDGES = [0, 50000, 100000, 200000, 500000]
+INF = float("inf")
+
+def _bit(product_id: int) -> int:
+    return 1 << product_id
+
+def _union(bitmaps) -> int:
+    result = 0
+    for bitmap in bitmaps:
+        result |= bitmap
+    return result
+
+def _bucket(price: float) -> int:
+    return max(bisect.bisect_right(PRICE_EDGES, price) - 1, 0)
+
+def _bucket_bounds(i: int):
+    # Bucket 0 also holds anything below the first edge
+    start = -INF if i == 0 else PRICE_EDGES[i]
+    end = PRICE_EDGES[i + 1] if i + 1 < len(PRICE_EDGES) else INF
+    return start, end
+
+class FacetIndex(CatalogIndex):
+    """Facet bitmaps for GET /api/products/facets (see CatalogIndex for how they stay current)."""
+    def _reset(self):
+        self.all = 0
+        self.categories = defaultdict(int)  # category name -> bitmap
+        self.colors = defaultdict(int)      # color id -> bitmap
+        self.sizes = defaultdict(int)       # size -> bitmap
+        self.is_new = 0
+        self.is_sale = 0
+        self.buckets = [0] * len(PRICE_EDGES)
+        self.prices = []                    # sorted (price, product_id)
+        self.attrs = {}                     # product_id -> (category, color ids, sizes, is_new, is_sale, price)
+
+    def add(self, product):
+        bit = _bit(product.id)
+        category = product.category.name if product.category else None
+        color_ids = [c.id for c in product.colors]
+        sizes = list(product.sizes or [])
+        self.all |= bit
+        if category:
+            self.categories[category] |= bit
+        for color_id in color_ids:
+            self.colors[color_id] |= bit
+        for size in sizes:
+            self.sizes[size] |= bit
+        if product.is_new:
+            self.is_new |= bit
+        if product.is_sale:
+            self.is_sale |= bit
+        if product.price is not None:
+            self.buckets[_bucket(product.price)] |= bit
+            bisect.insort(self.prices, (product.price, product.id))
+        self.attrs[product.id] = (category, color_ids, sizes, product.is_new, product.is_sale, product.price)
+
+    def remove(self, product_id: int):
+        attrs = self.attrs.pop(product_id, None)
+        if attrs is None:
+            return
+        category, color_ids, sizes, is_new, is_sale, price = attrs
+        mask = ~_bit(product_id)
+        self.all &= mask
+        if category:
+            self.categories[category] &= mask
+        for color_id in color_ids:
+            self.colors[color_id] &= mask
+        for size in sizes:
+            self.sizes[size] &= mask
+        self.is_new &= mask
+        self.is_sale &= mask
+        if price is not None:
+            self.buckets[_bucket(price)] &= mask
+            i = bisect.bisect_left(self.prices, (price, product_id))
+            if i < len(self.prices) and self.prices[i] == (price, product_id):
+                del self.prices[i]
+
+    def _price_range(self, min_price: float = None, max_price: float = None) -> int:
+        # Whole buckets inside the range are reused as-is; only the products
+        # of the (at most two) partially covered buckets are visited.
+        lo = -INF if min_price is None else min_price
+        hi = INF if max_price is None else max_price
+        result = 0
+        for i in range(len(PRICE_EDGES)):
+            start, end = _bucket_bounds(i)
+            if lo <= start and hi >= end:
+                result |= self.buckets[i]
+            elif lo < end and hi >= start:
+                first = bisect.bisect_left(self.prices, (max(lo, start), -1))
+                if hi < end:
+                    last = bisect.bisect_right(self.prices, (hi, INF))
+                else:
+                    last = bisect.bisect_left(self.prices, (end, -1))
+                result |= _union(_bit(product_id) for _, product_id in self.prices[first:last])
+        return result
+
+    def counts(self, category: str = None, color_ids=None, sizes=None,
+               min_price: float = None, max_price: float = None,
+               is_new: bool = None, is_sale: bool = None):
+        self.refresh()
+        with self._lock:
+            # One bitmap per active filter; None means "not filtering on it"
+            filters = {
+                "category": self.categories.get(category, 0) if category and category != "Todos" else None,
+                "colors": _union(self.colors.get(c, 0) for c in color_ids) if color_ids else None,
+                "sizes": _union(self.sizes.get(s, 0) for s in sizes) if sizes else None,
+                "price": self._price_range(min_price, max_price) if min_price is not None or max_price is not None else None,
+                "is_new": (self.is_new if is_new else self.all & ~self.is_new) if is_new is not None else None,
+                "is_sale": (self.is_sale if is_sale else self.all & ~self.is_sale) if is_sale is not None else None,
+            }
+
+            def matching(exclude: str = None) -> int:
+                result = self.all
+                for name, bitmap in filters.items():
+                    if bitmap is not None and name != exclude:
+                        result &= bitmap
+                return result
+
+            base = matching("price")
+            buckets = [
+                {
+                    "min": edge,
+                    "max": PRICE_EDGES[i + 1] if i + 1 < len(PRICE_EDGES) else None,
+                    "count": (base & self.buckets[i]).bit_count(),
+                }
+                for i, edge in enumerate(PRICE_EDGES)
+            ]
+
+            base = matching("category")
+            categories = {name: (base & b).bit_count() for name, b in self.categories.items() if b}
+            base = matching("colors")
+            colors = {color_id: (base & b).bit_count() for color_id, b in self.colors.items() if b}
+            base = matching("sizes")
+            size_counts = {size: (base & b).bit_count() for size, b in self.sizes.items() if b}
+            return {
+                "total": matching().bit_count(),
+                "categories": categories,
+                "colors": colors,
+                "sizes": size_counts,
+                "is_new": (matching("is_new") & self.is_new).bit_count(),
+                "is_sale": (matching("is_sale") & self.is_sale).bit_count(),
+                "price_buckets": buckets,
+            }
+
+facet_index = FacetIndex()
+crud.catalog_listeners.append(facet_index.on_catalog_change)
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import random
+import time
+import httpx
+
+# Load test for the hot API routes, to compare the sync (threadpool) and
+# async (DB_ASYNC=1) database paths. Start the API once per mode and run:
+#
+#   pip install httpx
+#   python load_test.py --url http://localhost:8000 --clients 500 --duration 30
+#
+# Each client loops over a mix of product listings, product detail reads and
+# visit records; pass --orders to also create orders (writes to the DB!).
+
+def order_body(product):
+    # Totals must match the server's pricing (pricing.order_total) or it answers 409
+    price = product["price"]
+    return {
+        "customer_name": "Load Test",
+        "customer_email": "loadtest@example.com",
+        "customer_phone": "0000000000",
+        "address": "N/A",
+        "city": "Quibdó",
+        "postal_code": "270001",
+        "total_amount": price + (0 if price >= 100000 else 15000),
+        "payment_method": "cash",
+        "items": [{"product_id": product["id"], "quantity": 1, "price": price}],
+    }
+
+def request_mix(with_orders: bool, products):
+    mix = [
+        ("GET", "/api/products?limit=20", None),
+        ("GET", "/api/products?limit=20&sort=price-asc&skip=20", None),
+        ("GET", "/api/products/{product_id}", None),
+        ("POST", "/api/record-visit", None),
+    ]
+    if with_orders and products:
+        mix.append(("POST", "/api/orders", order_body(products[0])))
+    return mix
+
+async def client_loop(http, mix, product_ids, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        method, path, body = random.choice(mix)
+        path = path.format(product_id=random.choice(product_ids))
+        start = time.perf_counter()
+        try:
+            response = await http.request(method, path, json=body)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+async def run(url: str, clients: int, duration: float, with_orders: bool):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as http:
+        products = (await http.get("/api/products", params={"limit": 100})).json()
+        product_ids = [p["id"] for p in products] or [1]
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(http, request_mix(with_orders, products), product_ids, deadline, latencies, errors)
+            for _ in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else 0
+    print(f"clients={clients} duration={elapsed:.1f}s requests={len(latencies)} errors={len(errors)}")
+    print(f"throughput={len(latencies) / elapsed:.1f} req/s")
+    print(f"latency ms: p50={pct(0.50):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} max={pct(1.0):.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test for the API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--orders", action="store_true", help="include POST /api/orders in the mix")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.clients, args.duration, args.orders))
@@ -1,13 +1,31 @@
-from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, Request
+from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, Request, Query, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
-from typing import List
-import crud, models, schemas, os, uuid
-from database import SessionLocal, engine
+from collections import namedtuple
+from datetime import date
+from typing import List, Optional
+import crud, models, schemas, pagination, pricing, database, hashlib, os, uuid
+import anyio
+from database import SessionLocal, DB_ASYNC, get_async_db
+from cache import catalog_cache, catalog_version, CATALOG_MAX_AGE
+from snapshot import catalog_snapshot, SNAPSHOT_PAGE_SIZE
+from search import search_index, suggest_index, SUGGEST_MAX_LIMIT
+from facets import facet_index
+from compression import CompressionMiddleware
+from order_export import EXPORT_FORMATS
+
+if DB_ASYNC:
+    import crud_async
+
+# Fast start (default on Vercel): schema creation is an explicit deploy step
+# (python create_tables.py) instead of a round trip per table on every cold start
+FAST_START = os.getenv("FAST_START", "1" if os.getenv("VERCEL") else "0").lower() not in ("0", "false", "no")
 
 # Create tables
-models.Base.metadata.create_all(bind=engine)
+if not FAST_START:
+    models.Base.metadata.create_all(bind=database.get_engine())
 
 app = FastAPI(title="Analia Boutique API")
 
@@ -18,15 +36,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "X-Missing-Ids", "Idempotent-Replayed"],
 )
 
-# Create uploads directory if not exists
+# gzip/brotli for JSON responses (the catalog snapshot is already precompressed)
+app.add_middleware(CompressionMiddleware)
+
+@app.exception_handler(crud.OutOfStock)
+def out_of_stock_handler(request: Request, exc: crud.OutOfStock):
+    return JSONResponse(status_code=409, content={"detail": {
+        "message": "No hay suficiente stock para algunos productos",
+        "items": exc.variants,
+    }})
+
+# Uploads directory is created on the first upload, not at import time
 UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
 
 # Mount static files
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Dependency
 def get_db():
@@ -36,30 +63,292 @@ def get_db():
     finally:
         db.close()
 
+def parse_fields(fields: Optional[str], view: Optional[str]):
+    """Resolve ?fields=a,b / ?view=summary into a tuple of product fields (None = full)."""
+    if view not in (None, "full", "summary"):
+        raise HTTPException(status_code=400, detail="Invalid view. Use 'full' or 'summary'")
+    if fields:
+        selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in selected if f not in crud.PRODUCT_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return selected or None
+    if view == "summary":
+        return crud.SUMMARY_FIELDS
+    return None
+
+def sparse_response(response: Response, content):
+    # Partial products don't fit the endpoint's response_model, so they bypass it
+    return JSONResponse(content=content, headers=dict(response.headers))
+
+def with_cursor_errors(fetch_page, *args, **kwargs):
+    try:
+        return fetch_page(*args, **kwargs)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# The catalog reads have a sync route or, with DB_ASYNC=1, an async one. Both
+# go through the same *_request function, which does everything but the
+# query (validation, conditional GET, snapshot, headers) and returns either a
+# finished response or a CrudCall: the crud / crud_async function to run,
+# by name, and what to do with its result. Only running it differs.
+CrudCall = namedtuple("CrudCall", ["name", "args", "kwargs", "finish"])
+
+def run_crud_call(call, db: Session):
+    if not isinstance(call, CrudCall):
+        return call
+    result = with_cursor_errors(getattr(crud, call.name), db, *call.args, **call.kwargs)
+    return call.finish(result)
+
+async def run_crud_call_async(call, db):
+    if not isinstance(call, CrudCall):
+        return call
+    try:
+        result = await getattr(crud_async, call.name)(db, *call.args, **call.kwargs)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return call.finish(result)
+
+def priced_order(order: schemas.OrderCreate):
+    """Replace client prices/total with server ones; 409 with current prices if they differ."""
+    try:
+        return pricing.price_order(order)
+    except pricing.PriceMismatch as e:
+        raise HTTPException(status_code=409, detail={
+            "message": "Los precios de algunos productos han cambiado",
+            "prices": e.prices,
+            "total_amount": e.total_amount,
+        })
+    except pricing.InvalidOrder as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def order_request_hash(order: schemas.OrderCreate):
+    return hashlib.sha256(order.model_dump_json().encode()).hexdigest()
+
+def check_idempotency_key(key: Optional[str]):
+    if key is not None and not 0 < len(key) <= 100:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-100 characters")
+
+def check_replay(record, request_hash: str):
+    if record.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key ya fue usada con otro pedido")
+
+def replay_order(record, order=None):
+    """Response for a retried POST /api/orders: the stored order, not a new one.
+
+    order is the record's order, read only when its response isn't stored yet
+    (the winner committed its order but hasn't saved the response).
+    """
+    body = record.response
+    if body is None:
+        body = schemas.Order.model_validate(order).model_dump(mode="json")
+    return JSONResponse(content=body, headers={"Idempotent-Replayed": "true"})
+
+def set_page_headers(response: Response, page: pagination.Page):
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
+    return page.items
+
+def not_modified(request: Request, response: Response):
+    """Conditional GET for catalog endpoints.
+
+    Returns a bare 304 when If-None-Match matches the current catalog ETag,
+    before any query or serialization runs; otherwise sets the validators on
+    the outgoing response and returns None.
+    """
+    etag = catalog_version.etag(f"{request.url.path}?{request.url.query}")
+    headers = {
+        "ETag": etag,
+        "Last-Modified": catalog_version.last_modified(),
+        "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}" if CATALOG_MAX_AGE else "public, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        for tag in (t.strip() for t in if_none_match.split(",")):
+            if tag == "*" or strip_encoding(tag) == etag:
+                # Echo the tag of the representation the client holds: the
+                # 200 it came from sent the encoding-suffixed ETag if compressed
+                if tag != "*":
+                    headers["ETag"] = tag
+                headers["Vary"] = "Accept-Encoding"
+                return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def strip_encoding(etag: str):
+    # Compressed representations carry the encoding in their ETag ("...-gzip")
+    for suffix in ('-gzip"', '-br"'):
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def snapshot_entry(skip: int, cursor: Optional[str], limit: int, filters: dict, selected):
+    """Snapshot page for the default first page of a category (full or summary view), if built."""
+    # A filter counts as given even when falsy (is_new=false, max_price=0)
+    given = [k for k, v in filters.items() if k != "category" and v is not None and v != []]
+    if skip or cursor or limit != SNAPSHOT_PAGE_SIZE or given:
+        return None
+    if selected is None:
+        return catalog_snapshot.get(filters["category"])
+    if selected == crud.SUMMARY_FIELDS:
+        return catalog_snapshot.get(filters["category"], view="summary")
+    return None
+
+def snapshot_response(request: Request, response: Response, entry):
+    """Serve a pre-serialized catalog page, picking a precompressed variant."""
+    headers = {k: v for k, v in response.headers.items() if k in ("etag", "last-modified", "cache-control")}
+    headers["Vary"] = "Accept-Encoding"
+    if entry.next_cursor:
+        headers["X-Next-Cursor"] = entry.next_cursor
+    accept_encoding = request.headers.get("accept-encoding", "")
+    body = entry.body
+    for encoding, compressed in (("br", entry.br), ("gzip", entry.gzip)):
+        if compressed is not None and encoding in accept_encoding:
+            body = compressed
+            headers["Content-Encoding"] = encoding
+            if "etag" in headers:
+                headers["etag"] = headers["etag"][:-1] + f'-{encoding}"'
+            break
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/api")
 @app.get("/api/")
 def api_root():
     return {"status": "ok", "message": "Analia Boutique API is running"}
 
-@app.get("/api/products", response_model=List[schemas.Product])
-def read_products(skip: int = 0, limit: int = 100, category: str = None, db: Session = Depends(get_db)):
-    products = crud.get_products(db, skip=skip, limit=limit, category=category)
-    return products
+def product_list_params(
+    skip: int = 0,
+    limit: int = 100,
+    category: str = None,
+    color_ids: List[int] = Query(None),
+    sizes: List[str] = Query(None),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_new: Optional[bool] = None,
+    is_sale: Optional[bool] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+):
+    """Query parameters of GET /api/products."""
+    return dict(
+        skip=skip, limit=limit, cursor=cursor, ids=ids, fields=fields, view=view,
+        filters=dict(
+            category=category, color_ids=color_ids, sizes=sizes, min_price=min_price, max_price=max_price,
+            is_new=is_new, is_sale=is_sale, sort=sort
+        ),
+    )
 
-@app.get("/api/products/{product_id}", response_model=schemas.Product)
-def read_product(product_id: int, db: Session = Depends(get_db)):
-    db_product = crud.get_product(db, product_id=product_id)
-    if db_product is None:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return db_product
+def products_request(params: dict, request: Request, response: Response):
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    skip, limit, cursor, filters = params["skip"], params["limit"], params["cursor"], params["filters"]
+    if params["ids"] is not None:
+        # Batch lookup (?ids=1,2,3) for cart/wishlist hydration; other filters don't apply
+        try:
+            product_ids = [int(i) for i in params["ids"].split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+
+        def found(result):
+            products, missing = result
+            if missing:
+                response.headers["X-Missing-Ids"] = ",".join(str(i) for i in missing)
+            return products
+        return CrudCall("get_products_by_ids_cached", (product_ids,), {}, found)
+    if filters["sort"] and filters["sort"] not in crud.PRODUCT_SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Use one of: {', '.join(crud.PRODUCT_SORTS)}")
+    selected = parse_fields(params["fields"], params["view"])
+    entry = snapshot_entry(skip, cursor, limit, filters, selected)
+    if entry:
+        return snapshot_response(request, response, entry)
+    if selected:
+        if skip and not cursor:
+            return CrudCall("get_products_fields_cached", (selected,), dict(skip=skip, limit=limit, **filters),
+                            lambda items: sparse_response(response, items))
+        return CrudCall("get_products_page_fields_cached", (selected,), dict(cursor=cursor, limit=limit, **filters),
+                        lambda page: sparse_response(response, set_page_headers(response, page)))
+    # skip/limit is kept for older clients; the first page and any cursor use keyset pagination
+    if skip and not cursor:
+        return CrudCall("get_products_cached", (), dict(skip=skip, limit=limit, **filters), lambda products: products)
+    return CrudCall("get_products_page_cached", (), dict(cursor=cursor, limit=limit, **filters),
+                    lambda page: set_page_headers(response, page))
+
+# With DB_ASYNC=1 the hot routes are registered as coroutines on an
+# AsyncSession instead of as sync routes; each route has exactly one handler.
+if DB_ASYNC:
+    @app.get("/api/products", response_model=List[schemas.Product])
+    async def read_products(request: Request, response: Response, params: dict = Depends(product_list_params), db=Depends(get_async_db)):
+        return await run_crud_call_async(products_request(params, request, response), db)
+else:
+    @app.get("/api/products", response_model=List[schemas.Product])
+    def read_products(request: Request, response: Response, params: dict = Depends(product_list_params), db: Session = Depends(get_db)):
+        return run_crud_call(products_request(params, request, response), db)
+
+@app.get("/api/products/facets", response_model=schemas.FacetCounts)
+def read_product_facets(
+    category: str = None,
+    color_ids: List[int] = Query(None),
+    sizes: List[str] = Query(None),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_new: Optional[bool] = None,
+    is_sale: Optional[bool] = None,
+):
+    return facet_index.counts(
+        category=category, color_ids=color_ids, sizes=sizes, min_price=min_price, max_price=max_price,
+        is_new=is_new, is_sale=is_sale
+    )
+
+@app.get("/api/products/search", response_model=List[schemas.Product])
+def search_products(q: str, skip: int = 0, limit: int = Query(20, le=100), response: Response = None, db: Session = Depends(get_db)):
+    product_ids, total = search_index.search(q, skip=skip, limit=limit)
+    response.headers["X-Total-Count"] = str(total)
+    return crud.get_products_by_ids(db, product_ids)
+
+@app.get("/api/products/suggest", response_model=List[schemas.Suggestion])
+def suggest_products(q: str, limit: int = Query(10, ge=1, le=SUGGEST_MAX_LIMIT)):
+    return suggest_index.suggest(q, limit=limit)
+
+def product_request(product_id: int, fields: Optional[str], request: Request, response: Response):
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+
+    def found(product):
+        if product is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product
+    selected = parse_fields(fields, None)
+    if selected:
+        return CrudCall("get_product_fields_cached", (product_id, selected), {},
+                        lambda data: sparse_response(response, found(data)))
+    return CrudCall("get_product_cached", (product_id,), {}, found)
+
+if DB_ASYNC:
+    @app.get("/api/products/{product_id}", response_model=schemas.Product)
+    async def read_product(product_id: int, request: Request, response: Response, fields: Optional[str] = None, db=Depends(get_async_db)):
+        return await run_crud_call_async(product_request(product_id, fields, request, response), db)
+else:
+    @app.get("/api/products/{product_id}", response_model=schemas.Product)
+    def read_product(product_id: int, request: Request, response: Response, fields: Optional[str] = None, db: Session = Depends(get_db)):
+        return run_crud_call(product_request(product_id, fields, request, response), db)
 
 @app.post("/api/products", response_model=schemas.Product)
 def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db)):
     return crud.create_product(db=db, product=product)
 
 @app.get("/api/categories", response_model=List[schemas.Category])
-def read_categories(db: Session = Depends(get_db)):
-    return crud.get_categories(db)
+def read_categories(request: Request, response: Response, db: Session = Depends(get_db)):
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    return crud.get_categories_cached(db)
 
 @app.post("/api/admin/categories", response_model=schemas.Category)
 def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
@@ -80,14 +369,22 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
     return {"message": message}
 
 @app.get("/api/colors", response_model=List[schemas.Color])
-def read_colors(db: Session = Depends(get_db)):
-    return crud.get_colors(db)
+def read_colors(request: Request, response: Response, db: Session = Depends(get_db)):
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    return crud.get_colors_cached(db)
 
-@app.post("/api/record-visit")
-def record_visit(request: Request, db: Session = Depends(get_db)):
-    client_host = request.client.host
-    crud.record_visit(db, ip_address=client_host)
-    return {"status": "ok"}
+if DB_ASYNC:
+    @app.post("/api/record-visit")
+    async def record_visit(request: Request, db=Depends(get_async_db)):
+        await crud_async.record_visit(db, ip_address=request.client.host)
+        return {"status": "ok"}
+else:
+    @app.post("/api/record-visit")
+    def record_visit(request: Request, db: Session = Depends(get_db)):
+        crud.record_visit(db, ip_address=request.client.host)
+        return {"status": "ok"}
 
 @app.post("/api/upload")
 async def upload_image(request: Request, file: UploadFile = File(...)):
@@ -105,6 +402,7 @@ async def upload_image(request: Request, file: UploadFile = File(...)):
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
     
     # Reset file pointer after reading for size validation
     with open(file_path, "wb") as buffer:
@@ -117,13 +415,47 @@ async def upload_image(request: Request, file: UploadFile = File(...)):
     
     return {"url": f"{base_url}/uploads/{unique_filename}"}
 
-@app.post("/api/orders", response_model=schemas.Order)
-def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
-    return crud.create_order(db=db, order=order)
+# Retries with the same Idempotency-Key get the stored order back; when a
+# concurrent duplicate wins the race, the request answers with its order.
+if DB_ASYNC:
+    @app.post("/api/orders", response_model=schemas.Order)
+    async def create_order(order: schemas.OrderCreate, idempotency_key: Optional[str] = Header(None), db=Depends(get_async_db)):
+        check_idempotency_key(idempotency_key)
+        # The price table loads through a blocking session; keep it off the event loop
+        if idempotency_key is None:
+            return await crud_async.create_order(db=db, order=await anyio.to_thread.run_sync(priced_order, order))
+        request_hash = order_request_hash(order)
+        record = await crud_async.get_idempotency_key(db, idempotency_key)
+        if record is None:
+            try:
+                priced = await anyio.to_thread.run_sync(priced_order, order)
+                return await crud_async.create_order(db=db, order=priced, idempotency_key=idempotency_key, request_hash=request_hash)
+            except crud.DuplicateIdempotencyKey:
+                record = await crud_async.get_idempotency_key(db, idempotency_key)
+        check_replay(record, request_hash)
+        stored = None if record.response is not None else await crud_async.get_order(db, record.order_id)
+        return replay_order(record, stored)
+else:
+    @app.post("/api/orders", response_model=schemas.Order)
+    def create_order(order: schemas.OrderCreate, idempotency_key: Optional[str] = Header(None), db: Session = Depends(get_db)):
+        check_idempotency_key(idempotency_key)
+        if idempotency_key is None:
+            return crud.create_order(db=db, order=priced_order(order))
+        request_hash = order_request_hash(order)
+        record = crud.get_idempotency_key(db, idempotency_key)
+        if record is None:
+            try:
+                return crud.create_order(db=db, order=priced_order(order), idempotency_key=idempotency_key, request_hash=request_hash)
+            except crud.DuplicateIdempotencyKey:
+                record = crud.get_idempotency_key(db, idempotency_key)
+        check_replay(record, request_hash)
+        stored = None if record.response is not None else crud.get_order(db, record.order_id)
+        return replay_order(record, stored)
 
-@app.get("/api/orders/user/{user_id}", response_model=List[schemas.Order])
-def read_user_orders(user_id: str, db: Session = Depends(get_db)):
-    return crud.get_user_orders(db, user_id=user_id)
+@app.get("/api/orders/user/{user_id}", response_model=List[schemas.OrderHistory])
+def read_user_orders(user_id: str, limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None, response: Response = None, db: Session = Depends(get_db)):
+    page = with_cursor_errors(crud.get_user_orders_page, db, user_id=user_id, cursor=cursor, limit=limit)
+    return set_page_headers(response, page)
 
 @app.get("/api/orders/{order_id}", response_model=schemas.Order)
 def read_order(order_id: int, email: str, db: Session = Depends(get_db)):
@@ -136,8 +468,66 @@ def read_order(order_id: int, email: str, db: Session = Depends(get_db)):
 
 # Admin Endpoints
 @app.get("/api/admin/orders", response_model=List[schemas.Order])
-def read_all_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_all_orders(db, skip=skip, limit=limit)
+def read_all_orders(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    city: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    response: Response = None,
+    db: Session = Depends(get_db),
+):
+    filters = dict(status=status, payment_method=payment_method, date_from=date_from, date_to=date_to, city=city, q=q)
+    # Cached per filter set (ORDER_COUNT_TTL) instead of a COUNT(*) per page
+    response.headers["X-Total-Count"] = str(crud.count_orders(db, **filters))
+    if skip and not cursor:
+        return crud.get_all_orders(db, skip=skip, limit=limit, **filters)
+    page = with_cursor_errors(crud.get_all_orders_page, db, cursor=cursor, limit=limit, **filters)
+    return set_page_headers(response, page)
+
+@app.get("/api/admin/orders/export")
+def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    city: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+):
+    # Streamed straight from a server-side cursor (order_export.py); the
+    # generator opens its own session since it outlives this function
+    stream, media_type = EXPORT_FORMATS[format]
+    filters = dict(status=status, payment_method=payment_method, date_from=date_from, date_to=date_to, city=city, q=q)
+    filename = f"pedidos-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        stream(**filters), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.patch("/api/admin/orders/status", response_model=schemas.OrderStatusBulkResult)
+def bulk_update_order_status(update: schemas.OrderStatusBulkUpdate, db: Session = Depends(get_db)):
+    if update.status not in crud.ORDER_TRANSITIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown status; expected one of: {', '.join(crud.ORDER_TRANSITIONS)}")
+    if (update.ids is None) == (update.filters is None):
+        raise HTTPException(status_code=400, detail="Send either ids or filters")
+    if update.filters is not None and not any(update.filters.model_dump().values()):
+        # filter_orders ignores unset filters, so {} would match every order
+        raise HTTPException(status_code=400, detail="filters must set at least one field")
+    filters = update.filters.model_dump() if update.filters else None
+    try:
+        results = crud.bulk_update_order_status(db, update.status, ids=update.ids, filters=filters)
+    except crud.TooManyOrders as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": update.status,
+        "updated": sum(1 for _, result, _ in results if result == "updated"),
+        "results": [{"id": order_id, "result": result, "status": status} for order_id, result, status in results],
+    }
 
 @app.patch("/api/admin/orders/{order_id}/status", response_model=schemas.Order)
 def update_order_status(order_id: int, status_update: dict, db: Session = Depends(get_db)):
@@ -149,6 +539,18 @@ def update_order_status(order_id: int, status_update: dict, db: Session = Depend
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
 
+@app.get("/api/admin/products/{product_id}/stock", response_model=List[schemas.StockLevel])
+def read_product_stock(product_id: int, db: Session = Depends(get_db)):
+    return crud.get_stock(db, product_id)
+
+@app.put("/api/admin/products/{product_id}/stock", response_model=List[schemas.StockLevel])
+def update_product_stock(product_id: int, levels: List[schemas.StockLevel], db: Session = Depends(get_db)):
+    if crud.get_product(db, product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    if any(level.quantity < 0 for level in levels):
+        raise HTTPException(status_code=400, detail="Stock quantities can't be negative")
+    return crud.set_stock(db, product_id, levels)
+
 @app.put("/api/admin/products/{product_id}", response_model=schemas.Product)
 def update_product(product_id: int, product: schemas.ProductCreate, db: Session = Depends(get_db)):
     db_product = crud.update_product(db, product_id=product_id, product=product)
@@ -167,9 +569,23 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
 def read_admin_stats(db: Session = Depends(get_db)):
     return crud.get_admin_stats(db)
 
+@app.get("/api/admin/cache-stats")
+def read_cache_stats():
+    return catalog_cache.stats()
+
+@app.get("/api/admin/pool-stats")
+async def read_pool_stats():
+    # async so it runs on the event loop, where the threadpool limiter lives
+    stats = database.pool_stats()
+    stats["threadpool_size"] = anyio.to_thread.current_default_thread_limiter().total_tokens
+    return stats
+
 @app.get("/api/admin/users")
-def read_all_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_all_users(db, skip=skip, limit=limit)
+def read_all_users(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, response: Response = None, db: Session = Depends(get_db)):
+    if skip and not cursor:
+        return crud.get_all_users(db, skip=skip, limit=limit)
+    page = with_cursor_errors(crud.get_all_users_page, db, cursor=cursor, limit=limit)
+    return set_page_headers(response, page)
 
 # Seed endpoint (for development)
 @app.post("/api/seed")
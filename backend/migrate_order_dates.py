@@ -0,0 +1,72 @@
+from sqlalchemy import inspect, text
+from database import engine
+import models
+
+# One-shot migration of the string date columns (MySQL): orders.created_at
+# VARCHAR -> DATETIME and visitors.visit_date VARCHAR -> DATE, then the
+# composite indexes declared in models.py. Prints EXPLAIN for the query
+# shapes crud.py runs before and after, so the plan change can be checked.
+# Safe to re-run.
+
+# Query shapes from crud.py (user history, admin listing and filters, tracking, visit dedupe)
+EXPLAIN_QUERIES = {
+    "user order history": "SELECT id FROM orders WHERE user_id = 'u1' ORDER BY created_at DESC, id DESC LIMIT 21",
+    "admin order listing": "SELECT id FROM orders ORDER BY created_at DESC, id DESC LIMIT 101",
+    "admin status filter": "SELECT id FROM orders WHERE status = 'pending' ORDER BY created_at DESC, id DESC LIMIT 101",
+    "admin customer search": "SELECT id FROM orders WHERE customer_email LIKE 'ana%' OR customer_name LIKE 'ana%'",
+    "order tracking": "SELECT id FROM orders WHERE id = 1 AND customer_email = 'a@example.com'",
+    "daily visit dedupe": "SELECT id FROM visitors WHERE ip_address = '127.0.0.1' AND visit_date = '2024-01-01' LIMIT 1",
+}
+
+def explain(label: str):
+    print(f"--- EXPLAIN {label} ---")
+    with engine.connect() as conn:
+        for name, sql in EXPLAIN_QUERIES.items():
+            result = conn.execute(text(f"EXPLAIN {sql}"))
+            print(f"{name}:")
+            for row in result.mappings():
+                print("   ", {k: row[k] for k in ("type", "possible_keys", "key", "rows", "Extra") if k in row})
+
+def column_type(table: str, column: str) -> str:
+    for c in inspect(engine).get_columns(table):
+        if c["name"] == column:
+            return str(c["type"]).upper()
+    return ""
+
+def index_names(table: str):
+    return {i["name"] for i in inspect(engine).get_indexes(table)}
+
+def convert_column(table: str, column: str, sql_type: str, pattern: str, parse_format: str):
+    """Copy a string column into a typed one and swap them; unparseable values become NULL."""
+    if not column_type(table, column).startswith("VARCHAR"):
+        print(f"{table}.{column} already converted")
+        return
+    print(f"Converting {table}.{column} to {sql_type}...")
+    with engine.begin() as conn:
+        # Indexes on the old column would otherwise survive with the column dropped out of them
+        for index in inspect(engine).get_indexes(table):
+            if column in index["column_names"]:
+                conn.execute(text(f"ALTER TABLE {table} DROP INDEX {index['name']}"))
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column}_new {sql_type} NULL"))
+        conn.execute(
+            text(f"UPDATE {table} SET {column}_new = STR_TO_DATE({column}, :fmt) WHERE {column} REGEXP :pattern"),
+            {"fmt": parse_format, "pattern": pattern},
+        )
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}, CHANGE {column}_new {column} {sql_type} NULL"))
+
+def migrate():
+    explain("before")
+    convert_column("orders", "created_at", "DATETIME",
+                   r"^[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}$", "%Y-%m-%d %H:%i:%s")
+    convert_column("visitors", "visit_date", "DATE", r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$", "%Y-%m-%d")
+    for table in (models.Order.__table__, models.Visitor.__table__):
+        existing = index_names(table.name)
+        for index in table.indexes:
+            if index.name not in existing:
+                print(f"Creating index {index.name}...")
+                index.create(bind=engine)
+    explain("after")
+    print("Order and visitor dates migrated successfully!")
+
+if __name__ == "__main__":
+    migrate()
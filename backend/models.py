@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, JSON, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, JSON, Date, DateTime, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -8,7 +8,30 @@ product_colors = Table(
     "product_colors",
     Base.metadata,
     Column("product_id", Integer, ForeignKey("products.id")),
-    Column("color_id", Integer, ForeignKey("colors.id"))
+    Column("color_id", Integer, ForeignKey("colors.id")),
+    Index("ix_product_colors_color_product", "color_id", "product_id")
+)
+
+# Normalized copy of Product.sizes (the JSON column stays the source for
+# serialization). Kept in sync by crud so size filters can use an index
+# instead of parsing JSON per row.
+product_sizes = Table(
+    "product_sizes",
+    Base.metadata,
+    Column("product_id", Integer, ForeignKey("products.id"), primary_key=True),
+    Column("size", String(20), primary_key=True),
+    Index("ix_product_sizes_size_product", "size", "product_id")
+)
+
+# Stock per variant; "" means the product has no size/color dimension.
+# Variants without a row are not tracked (unlimited).
+product_stock = Table(
+    "product_stock",
+    Base.metadata,
+    Column("product_id", Integer, ForeignKey("products.id"), primary_key=True),
+    Column("size", String(20), primary_key=True, default=""),
+    Column("color", String(50), primary_key=True, default=""),
+    Column("quantity", Integer, nullable=False, default=0)
 )
 
 class Category(Base):
@@ -31,13 +54,14 @@ class Product(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), index=True)
     description = Column(String(500))
-    price = Column(Float)
+    price = Column(Float, index=True)
     original_price = Column(Float, nullable=True)
     images = Column(JSON) # List of image URLs
-    category_id = Column(Integer, ForeignKey("categories.id"))
+    primary_image = Column(String(500), nullable=True) # images[0], for list views
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
     sizes = Column(JSON) # List of sizes
-    is_new = Column(Boolean, default=False)
-    is_sale = Column(Boolean, default=False)
+    is_new = Column(Boolean, default=False, index=True)
+    is_sale = Column(Boolean, default=False, index=True)
     features = Column(JSON) # List of features
 
     category = relationship("Category", back_populates="products")
@@ -55,12 +79,25 @@ class Order(Base):
     total_amount = Column(Float)
     payment_method = Column(String(50)) # 'wompi' or 'cash'
     status = Column(String(50), default="pending") # 'pending', 'paid', 'delivered'
-    created_at = Column(String(50)) # For simplicity, can be DateTime
+    created_at = Column(DateTime, default=datetime.now)
     postal_code = Column(String(20), nullable=True)
 
     items = relationship("OrderItem", back_populates="order")
     user_id = Column(String(100), nullable=True)
 
+    __table_args__ = (
+        # Admin listing (ORDER_SORT)
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # Order history of a user, newest first
+        Index("ix_orders_user_created_at", "user_id", "created_at", "id"),
+        Index("ix_orders_customer_email", "customer_email"),
+        # Admin listing filters (crud.filter_orders), each followed by the sort
+        Index("ix_orders_status_created_at", "status", "created_at", "id"),
+        Index("ix_orders_payment_created_at", "payment_method", "created_at", "id"),
+        Index("ix_orders_city_created_at", "city", "created_at", "id"),
+        Index("ix_orders_customer_name", "customer_name"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
@@ -84,10 +121,34 @@ class User(Base):
     name = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
 class Visitor(Base):
     __tablename__ = "visitors"
 
     id = Column(Integer, primary_key=True, index=True)
     ip_address = Column(String(50))
-    visit_date = Column(String(20)) # Format: YYYY-MM-DD
+    visit_date = Column(Date)
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Daily dedupe in record_visit
+        Index("ix_visitors_ip_date", "ip_address", "visit_date"),
+    )
+
+class IdempotencyKey(Base):
+    """Idempotency-Key of a POST /api/orders request and the order it created."""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(100), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"))
+    response = Column(JSON, nullable=True)  # serialized order, stored after commit
+    created_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("ux_idempotency_keys_key", "key", unique=True),
+    )
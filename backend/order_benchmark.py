@@ -0,0 +1,64 @@
+import argparse
+import time
+from sqlalchemy import event
+from database import SessionLocal, engine
+import models, schemas, crud
+
+# Orders/second for crud.create_order with 1, 10 and 50 line items, plus the
+# number of SQL statements each order costs. Orders created here are deleted
+# at the end.
+#
+#   python order_benchmark.py --orders 200
+
+def make_order(product_id: int, n_items: int) -> schemas.OrderCreate:
+    return schemas.OrderCreate(
+        customer_name="Benchmark",
+        customer_email="benchmark@example.com",
+        customer_phone="0000000000",
+        address="N/A",
+        city="Quibdó",
+        postal_code="270001",
+        total_amount=1000.0 * n_items,
+        payment_method="cash",
+        items=[
+            schemas.OrderItemBase(product_id=product_id, quantity=1, price=1000.0, size="M")
+            for _ in range(n_items)
+        ],
+    )
+
+def run(orders: int, sizes):
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*args, **kwargs):
+        statements[0] += 1
+
+    db = SessionLocal()
+    created = []
+    try:
+        product = db.query(models.Product.id).first()
+        if product is None:
+            raise SystemExit("No products found; run seed_db.py first")
+        for n_items in sizes:
+            order = make_order(product.id, n_items)
+            statements[0] = 0
+            started = time.perf_counter()
+            for _ in range(orders):
+                created.append(crud.create_order(db, order).id)
+            elapsed = time.perf_counter() - started
+            print(f"{n_items:>3} items: {orders / elapsed:8.1f} orders/s, "
+                  f"{elapsed / orders * 1000:6.2f} ms/order, {statements[0] / orders:.1f} statements/order")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        if created:
+            db.query(models.OrderItem).filter(models.OrderItem.order_id.in_(created)).delete(synchronize_session=False)
+            db.query(models.Order).filter(models.Order.id.in_(created)).delete(synchronize_session=False)
+            db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="create_order throughput benchmark")
+    parser.add_argument("--orders", type=int, default=200, help="orders per line-item count")
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+    run(args.orders, args.items)
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import os
+from sqlalchemy import select
+import database, models, crud
+
+# Streaming order exports (CSV / NDJSON) for accounting.
+#
+# Rows are read with yield_per, which on MySQL uses a server-side cursor, and
+# written out one batch at a time, so memory stays flat however many orders
+# are exported. Nothing goes through the ORM: each row is a plain tuple of
+# order, item and product-name columns from one LEFT JOIN ordered by order id.
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+ORDER_COLUMNS = (
+    "id", "created_at", "status", "customer_name", "customer_email", "customer_phone",
+    "address", "city", "postal_code", "payment_method", "total_amount", "user_id",
+)
+ITEM_COLUMNS = ("id", "product_id", "product_name", "quantity", "price", "size", "color")
+# One CSV row per line item; orders without items get one row with empty item fields
+CSV_HEADER = ["order_" + c if c == "id" else c for c in ORDER_COLUMNS] + ["item_" + c if c == "id" else c for c in ITEM_COLUMNS]
+
+def _export_query(**filters):
+    Order, OrderItem, Product = models.Order, models.OrderItem, models.Product
+    stmt = (
+        select(
+            *(getattr(Order, c) for c in ORDER_COLUMNS),
+            OrderItem.id, OrderItem.product_id, Product.name, OrderItem.quantity,
+            OrderItem.price, OrderItem.size, OrderItem.color,
+        )
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+    )
+    # Only the order id is sorted on: items of one order then arrive together
+    # (in order_id index order) without sorting the whole join
+    return crud.filter_orders(stmt, **filters).order_by(Order.id)
+
+def _format_date(value):
+    # Same format as schemas.Order.created_at
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+def export_batches(**filters):
+    """Yield lists of export rows (tuples in ORDER_COLUMNS + ITEM_COLUMNS order)."""
+    db = database.SessionLocal()
+    try:
+        stmt = _export_query(**filters).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        for batch in db.execute(stmt).partitions():
+            yield batch
+    finally:
+        db.close()
+
+def csv_stream(**filters):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    created_at = ORDER_COLUMNS.index("created_at")
+    for batch in export_batches(**filters):
+        for row in batch:
+            row = list(row)
+            row[created_at] = _format_date(row[created_at])
+            writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def ndjson_stream(**filters):
+    """One JSON object per order, with its items nested like the API's Order."""
+    n = len(ORDER_COLUMNS)
+    order = None
+    for batch in export_batches(**filters):
+        lines = []
+        for row in batch:
+            # An order's items can straddle two batches, so an order is only
+            # written once the next one starts
+            if order is None or order["id"] != row[0]:
+                if order is not None:
+                    lines.append(json.dumps(order, ensure_ascii=False))
+                order = dict(zip(ORDER_COLUMNS, row[:n]))
+                order["created_at"] = _format_date(order["created_at"])
+                order["items"] = []
+            if row[n] is not None:
+                order["items"].append(dict(zip(ITEM_COLUMNS, row[n:])))
+        if lines:
+            yield "\n".join(lines) + "\n"
+    if order is not None:
+        yield json.dumps(order, ensure_ascii=False) + "\n"
+
+EXPORT_FORMATS = {
+    "csv": (csv_stream, "text/csv; charset=utf-8"),
+    "ndjson": (ndjson_stream, "application/x-ndjson"),
+}
@@ -0,0 +1,119 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+# Keyset (cursor) pagination helpers.
+#
+# A sort is a sequence of (column, descending) pairs whose last entry is the
+# primary key, so every row has a unique position. Cursors are opaque base64
+# tokens holding the sort values of the boundary row plus the direction to
+# move in, which lets each page be fetched with an indexed range condition
+# instead of OFFSET.
+
+Page = namedtuple("Page", ["items", "next_cursor", "prev_cursor"])
+
+class InvalidCursor(ValueError):
+    pass
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+def _load_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+def encode_cursor(row, keys, direction: str) -> str:
+    values = [_dump_value(getattr(row, column.key)) for column, _ in keys]
+    payload = json.dumps({"v": values, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _valid_value(column, value) -> bool:
+    # Cursors come from clients, so each value must fit its sort column before
+    # it reaches a comparison (None, lists or objects would fail in the driver)
+    python_type = column.type.python_type
+    if python_type is bool:
+        return isinstance(value, bool) or (type(value) is int and value in (0, 1))
+    if python_type is int:
+        return type(value) is int
+    if python_type is float:
+        return type(value) in (int, float)
+    if python_type is str:
+        return isinstance(value, str)
+    if python_type is datetime:
+        return isinstance(value, datetime)
+    return value is not None and not isinstance(value, (list, dict))
+
+def decode_cursor(cursor: str, keys):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_load_value(v) for v in payload["v"]]
+        direction = payload["d"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if direction not in ("next", "prev") or len(values) != len(keys):
+        raise InvalidCursor("Invalid cursor")
+    if not all(_valid_value(column, value) for (column, _), value in zip(keys, values)):
+        raise InvalidCursor("Invalid cursor")
+    return values, direction
+
+def order_by(keys, reverse: bool = False):
+    return [column.asc() if descending == reverse else column.desc() for column, descending in keys]
+
+def _after(keys, values, reverse: bool):
+    # (a, b, id) > (x, y, z) expanded as a > x OR (a = x AND b > y) OR ...,
+    # honouring the direction of each column. The OR alone is not a range the
+    # optimizer can seek to, so it is ANDed with a >= x on the leading column;
+    # otherwise deep pages scan the index from its start.
+    values = [int(v) if isinstance(v, bool) else v for v in values]  # SQLAlchemy only allows = / != against True/False
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        past = column < values[i] if descending != reverse else column > values[i]
+        equal = [keys[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, past))
+    if len(keys) == 1:
+        return clauses[0]
+    column, descending = keys[0]
+    bound = column <= values[0] if descending != reverse else column >= values[0]
+    return and_(bound, or_(*clauses))
+
+def _page_query(query, keys, cursor: str = None, limit: int = 100):
+    # Works for both legacy Query objects and 2.0 select() statements
+    if cursor:
+        values, direction = decode_cursor(cursor, keys)
+    else:
+        values, direction = None, "next"
+
+    reverse = direction == "prev"
+    if values is not None:
+        query = query.filter(_after(keys, values, reverse))
+    return query.order_by(*order_by(keys, reverse)).limit(limit + 1), values, reverse
+
+def _make_page(rows, keys, values, reverse: bool, limit: int) -> Page:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or reverse:
+            next_cursor = encode_cursor(rows[-1], keys, "next")
+        if values is not None and (has_more or not reverse):
+            prev_cursor = encode_cursor(rows[0], keys, "prev")
+    return Page(rows, next_cursor, prev_cursor)
+
+def paginate(query, keys, cursor: str = None, limit: int = 100) -> Page:
+    query, values, reverse = _page_query(query, keys, cursor, limit)
+    return _make_page(query.all(), keys, values, reverse, limit)
+
+async def paginate_async(db, stmt, keys, cursor: str = None, limit: int = 100) -> Page:
+    """paginate() for a select() statement executed on an AsyncSession."""
+    stmt, values, reverse = _page_query(stmt, keys, cursor, limit)
+    rows = list((await db.execute(stmt)).scalars().all())
+    return _make_page(rows, keys, values, reverse, limit)
@@ -0,0 +1,63 @@
+import argparse
+import sys
+from sqlalchemy import func
+from database import SessionLocal
+from benchmark_utils import timed, insert_orders, delete_orders, add_data_args
+import models, crud, pagination
+
+# Page latency by depth for the admin order listing: inserts --orders
+# synthetic orders, then times the first page and pages at increasing depths
+# through the keyset cursor path (get_all_orders_page) and the old OFFSET
+# path (get_all_orders). The cursor path should stay flat: its deepest page
+# may take at most --max-ratio times the first page. The synthetic orders are
+# deleted at the end (--keep to reuse them on the next run with --skip-insert).
+#
+#   python pagination_benchmark.py --orders 1000000 --limit 100
+
+EMAIL = "pagination-benchmark@example.com"
+DEPTHS = (0, 0.1, 0.5, 0.9, 0.99)
+
+def cursor_at(db, offset: int):
+    """The "next" cursor a client holds after walking to row `offset`."""
+    if offset == 0:
+        return None
+    row = (db.query(models.Order.created_at, models.Order.id)
+           .order_by(*pagination.order_by(crud.ORDER_SORT)).offset(offset - 1).first())
+    return pagination.encode_cursor(row, crud.ORDER_SORT, "next")
+
+def run(orders: int, limit: int, repeat: int, max_ratio: float, skip_insert: bool, keep: bool):
+    db = SessionLocal()
+    try:
+        if not skip_insert:
+            insert_orders(db, orders, EMAIL, "Pagination Benchmark")
+        total = db.query(func.count(models.Order.id)).scalar()
+        results = []
+        for depth in DEPTHS:
+            offset = min(int(total * depth), max(total - limit, 0))
+            cursor = cursor_at(db, offset)
+            keyset, _ = timed(lambda: crud.get_all_orders_page(db, cursor=cursor, limit=limit), repeat)
+            db.expunge_all()
+            offset_ms, _ = timed(lambda: crud.get_all_orders(db, skip=offset, limit=limit), repeat)
+            db.expunge_all()
+            results.append(keyset)
+            print(f"offset {offset:>9}: cursor {keyset:8.2f} ms   OFFSET {offset_ms:8.2f} ms")
+        ratio = results[-1] / results[0]
+        print(f"Deepest/first page (cursor): {ratio:.2f}x (budget {max_ratio:.1f}x)")
+        ok = ratio <= max_ratio
+        print("OK: cursor page latency is flat" if ok else "FAILED: cursor pages slow down with depth")
+        return ok
+    finally:
+        if not keep:
+            delete_orders(db, EMAIL)
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keyset vs OFFSET page latency by depth")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per page (median is reported)")
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="allowed deepest/first cursor page latency")
+    add_data_args(parser, "orders")
+    args = parser.parse_args()
+    if not run(args.orders, args.limit, args.repeat, args.max_ratio, args.skip_insert, args.keep):
+        sys.exit(1)
@@ -0,0 +1,135 @@
+import threading
+import time
+import database, models, crud
+from cache import CATALOG_CACHE_TTL
+
+# Server-side pricing for checkout.
+#
+# Current product prices live in an in-memory table kept in sync through
+# crud.catalog_listeners, so pricing an order costs no queries. Line totals
+# and the order total are recomputed here with the same rules as the
+# storefront checkout and compared with what the client sent; a mismatch
+# is only reported after re-reading the involved prices from the database
+# (one IN query), so a stale table never rejects a correct order.
+
+FREE_SHIPPING_THRESHOLD = 100000
+SHIPPING_COST = 15000
+COD_FEE = 3  # cash on delivery surcharge added by the checkout
+TOLERANCE = 0.01
+
+class InvalidOrder(ValueError):
+    pass
+
+class PriceMismatch(InvalidOrder):
+    def __init__(self, prices, total_amount: float):
+        super().__init__("Prices have changed")
+        self.prices = prices
+        self.total_amount = total_amount
+
+class PriceTable:
+    def __init__(self, max_age: float = CATALOG_CACHE_TTL):
+        self.max_age = max_age
+        self._prices = {}  # product_id -> price
+        self._dirty = set()
+        self._stale = True
+        self.built_at = 0.0
+        self._lock = threading.RLock()
+
+    def on_catalog_change(self, kind: str, key=None):
+        with self._lock:
+            if kind == "product":
+                self._dirty.add(key)
+
+    def _load(self, product_ids=None):
+        db = database.SessionLocal()
+        try:
+            query = db.query(models.Product.id, models.Product.price)
+            if product_ids is not None:
+                query = query.filter(models.Product.id.in_(product_ids))
+            return dict(query.all())
+        finally:
+            db.close()
+
+    def refresh(self):
+        """Apply pending product writes; reload everything once max_age has passed
+        (writes made by other instances are not notified here)."""
+        with self._lock:
+            full = self._stale or time.time() - self.built_at > self.max_age
+            if not full and not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            try:
+                if full:
+                    self._prices = self._load()
+                    self.built_at = time.time()
+                    self._stale = False
+                else:
+                    loaded = self._load(dirty)
+                    for product_id in dirty:
+                        if product_id in loaded:
+                            self._prices[product_id] = loaded[product_id]
+                        else:
+                            self._prices.pop(product_id, None)
+            except Exception:
+                self._stale = True
+                raise
+
+    def get(self, product_ids):
+        self.refresh()
+        with self._lock:
+            return {i: self._prices[i] for i in product_ids if i in self._prices}
+
+    def reload(self, product_ids):
+        """Read product_ids straight from the database and update the table."""
+        loaded = self._load(product_ids)
+        with self._lock:
+            for product_id in product_ids:
+                if product_id in loaded:
+                    self._prices[product_id] = loaded[product_id]
+                else:
+                    self._prices.pop(product_id, None)
+        return loaded
+
+price_table = PriceTable()
+crud.catalog_listeners.append(price_table.on_catalog_change)
+
+def order_total(subtotal: float, payment_method: str) -> float:
+    shipping = 0 if subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_COST
+    return subtotal + shipping + (COD_FEE if payment_method == "cod" else 0)
+
+def _compute(order, prices):
+    subtotal = sum(prices[item.product_id] * item.quantity for item in order.items)
+    total = order_total(subtotal, order.payment_method)
+    matches = abs(total - order.total_amount) <= TOLERANCE and all(
+        abs(prices[item.product_id] - item.price) <= TOLERANCE for item in order.items
+    )
+    return total, matches
+
+def price_order(order):
+    """Return a copy of order with server prices and total.
+
+    Raises InvalidOrder for empty orders, bad quantities or unknown products
+    and PriceMismatch when the client's prices or total are out of date.
+    """
+    if not order.items:
+        raise InvalidOrder("Order has no items")
+    if any(item.quantity < 1 for item in order.items):
+        raise InvalidOrder("Item quantities must be at least 1")
+    product_ids = list(dict.fromkeys(item.product_id for item in order.items))
+
+    prices = price_table.get(product_ids)
+    matches = False
+    if len(prices) == len(product_ids):
+        total, matches = _compute(order, prices)
+    if not matches:
+        # Confirm against the database before rejecting anything
+        prices = price_table.reload(product_ids)
+        missing = [i for i in product_ids if i not in prices]
+        if missing:
+            raise InvalidOrder(f"Unknown products: {', '.join(str(i) for i in missing)}")
+        total, matches = _compute(order, prices)
+        if not matches:
+            raise PriceMismatch(prices, total)
+
+    items = [item.model_copy(update={"price": prices[item.product_id]}) for item in order.items]
+    return order.model_copy(update={"items": items, "total_amount": total})
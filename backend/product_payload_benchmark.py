@@ -0,0 +1,51 @@
+import argparse
+import statistics
+import time
+import httpx
+
+# Payload size and latency of GET /api/products for the full representation,
+# ?view=summary and a ?fields= selection, against a running server. Each
+# variant is fetched --repeat times; the body size is reported uncompressed
+# and gzip-compressed (as sent to browsers), with the median and p95 latency.
+#
+#   python product_payload_benchmark.py --url http://localhost:8000 --limit 100
+
+def variants(fields: str):
+    return (
+        ("full", {}),
+        ("view=summary", {"view": "summary"}),
+        (f"fields={fields}", {"fields": fields}),
+    )
+
+def measure(http: httpx.Client, params: dict, repeat: int, encoding: str):
+    samples, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = http.get("/api/products", params=params, headers={"Accept-Encoding": encoding})
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        # Bytes on the wire, before httpx decompresses them
+        size = int(response.headers.get("content-length") or len(response.content))
+    samples.sort()
+    return size, statistics.median(samples), samples[max(int(len(samples) * 0.95) - 1, 0)]
+
+def run(url: str, limit: int, category: str, fields: str, repeat: int):
+    with httpx.Client(base_url=url, timeout=60) as http:
+        for label, params in variants(fields):
+            params = {**params, "limit": limit}
+            if category:
+                params["category"] = category
+            size, p50, p95 = measure(http, params, repeat, "identity")
+            gzip_size, gzip_p50, gzip_p95 = measure(http, params, repeat, "gzip")
+            print(f"{label:<40} {size:>9} B  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms   "
+                  f"gzip {gzip_size:>8} B  p50 {gzip_p50:7.2f} ms  p95 {gzip_p95:7.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Product list payload size and latency by representation")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--category", default=None)
+    parser.add_argument("--fields", default="id,name,price,primary_image", help="selection for the fields= variant")
+    parser.add_argument("--repeat", type=int, default=50, help="requests per variant")
+    args = parser.parse_args()
+    run(args.url, args.limit, args.category, args.fields, args.repeat)
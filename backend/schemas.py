@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, field_serializer
+from typing import Dict, List, Optional
+from datetime import date, datetime
 
 class ColorBase(BaseModel):
     name: str
@@ -49,6 +49,30 @@ class Product(ProductBase):
     class Config:
         from_attributes = True
 
+class Suggestion(BaseModel):
+    type: str # 'product' or 'category'
+    id: int
+    name: str
+
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+class FacetCounts(BaseModel):
+    total: int
+    categories: Dict[str, int]
+    colors: Dict[int, int]
+    sizes: Dict[str, int]
+    is_new: int
+    is_sale: int
+    price_buckets: List[PriceBucket]
+
+class StockLevel(BaseModel):
+    size: Optional[str] = None
+    color: Optional[str] = None
+    quantity: int
+
 class OrderItemBase(BaseModel):
     product_id: int
     quantity: int
@@ -61,6 +85,16 @@ class OrderItem(OrderItemBase):
     class Config:
         from_attributes = True
 
+class OrderItemProduct(BaseModel):
+    id: int
+    name: str
+    primary_image: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+class OrderHistoryItem(OrderItem):
+    product: Optional[OrderItemProduct] = None
+
 class OrderCreate(BaseModel):
     customer_name: str
     customer_email: str
@@ -76,14 +110,46 @@ class OrderCreate(BaseModel):
 class Order(OrderCreate):
     id: int
     status: str
-    created_at: str
+    created_at: datetime
     postal_code: Optional[str] = None
     user_id: Optional[str] = None
     items: List[OrderItem]
 
+    # Keep the "YYYY-MM-DD HH:MM:SS" format clients got when this was a string column
+    @field_serializer("created_at")
+    def serialize_created_at(self, created_at: datetime):
+        return created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else None
+
     class Config:
         from_attributes = True
 
+class OrderFilters(BaseModel):
+    status: Optional[str] = None
+    payment_method: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    city: Optional[str] = None
+    q: Optional[str] = None
+
+class OrderStatusBulkUpdate(BaseModel):
+    status: str
+    # Exactly one of ids or filters
+    ids: Optional[List[int]] = None
+    filters: Optional[OrderFilters] = None
+
+class OrderStatusResult(BaseModel):
+    id: int
+    result: str  # updated, unchanged, invalid_transition, not_found
+    status: Optional[str] = None  # status the order has after the request
+
+class OrderStatusBulkResult(BaseModel):
+    status: str
+    updated: int
+    results: List[OrderStatusResult]
+
+class OrderHistory(Order):
+    items: List[OrderHistoryItem]
+
 class UserBase(BaseModel):
     email: EmailStr
     name: str
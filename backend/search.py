@@ -0,0 +1,248 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from sqlalchemy import func
+import database, models, crud
+from cache import catalog_version, CATALOG_CACHE_TTL
+from catalog_index import CatalogIndex
+
+# In-memory indexes over the catalog for GET /api/products/search (inverted
+# index) and GET /api/products/suggest (sorted prefix array).
+#
+# Text is folded (accents stripped, casefolded) so "lenceria" finds
+# "Lencería". Each token maps to {product_id: weighted term frequency} and
+# results are ranked by the sum of weight * idf over the query terms. The last
+# query term also matches as a prefix so results update while typing.
+
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "features": 1.5, "description": 1.0}
+STOPWORDS = {
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "para", "por", "que", "se", "su", "sus", "un", "una", "y",
+}
+_TOKEN_RE = re.compile(r"\w+")
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents (á -> a, ñ -> n) for Spanish text."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def tokenize(text: str):
+    return [t for t in _TOKEN_RE.findall(fold(text)) if t not in STOPWORDS]
+
+def product_fields(product):
+    return {
+        "name": product.name or "",
+        "category": product.category.name if product.category else "",
+        "features": " ".join(product.features or []),
+        "description": product.description or "",
+    }
+
+class SearchIndex(CatalogIndex):
+    """Inverted index for GET /api/products/search (see CatalogIndex for how it stays current)."""
+    def _reset(self):
+        self.postings = defaultdict(dict)  # token -> {product_id: weight}
+        self.doc_tokens = {}               # product_id -> set of tokens, for removal
+        self.vocabulary = []               # sorted tokens, for prefix lookups
+
+    def add(self, product):
+        weights = defaultdict(float)
+        for field, text in product_fields(product).items():
+            for token in tokenize(text):
+                weights[token] += FIELD_WEIGHTS[field]
+        new_tokens = [t for t in weights if t not in self.postings]
+        for token, weight in weights.items():
+            self.postings[token][product.id] = weight
+        self.doc_tokens[product.id] = set(weights)
+        for token in new_tokens:
+            bisect.insort(self.vocabulary, token)
+
+    def remove(self, product_id: int):
+        for token in self.doc_tokens.pop(product_id, ()):
+            docs = self.postings.get(token)
+            if docs is None:
+                continue
+            docs.pop(product_id, None)
+            if not docs:
+                del self.postings[token]
+                i = bisect.bisect_left(self.vocabulary, token)
+                if i < len(self.vocabulary) and self.vocabulary[i] == token:
+                    del self.vocabulary[i]
+
+    def _expand(self, token: str, prefix: bool):
+        if not prefix:
+            return [token] if token in self.postings else []
+        i = bisect.bisect_left(self.vocabulary, token)
+        matches = []
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+            matches.append(self.vocabulary[i])
+            i += 1
+        return matches
+
+    def search(self, q: str, skip: int = 0, limit: int = 20):
+        """Return (ranked product ids for the page, total number of matches)."""
+        self.refresh()
+        terms = tokenize(q)
+        if not terms:
+            return [], 0
+        with self._lock:
+            n_docs = max(len(self.doc_tokens), 1)
+            scores = None
+            for i, term in enumerate(terms):
+                # Every term must match (AND); the last one may be a prefix
+                term_scores = defaultdict(float)
+                for token in self._expand(term, prefix=i == len(terms) - 1):
+                    docs = self.postings[token]
+                    idf = math.log(1 + n_docs / len(docs))
+                    for product_id, weight in docs.items():
+                        term_scores[product_id] = max(term_scores[product_id], weight * idf)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+                if not scores:
+                    return [], 0
+        ranked = sorted(scores, key=lambda pid: (-scores[pid], pid))
+        return ranked[skip:skip + limit], len(ranked)
+
+# Largest limit GET /api/products/suggest accepts; heavy prefixes keep this many
+SUGGEST_MAX_LIMIT = 50
+
+class SuggestIndex:
+    """Typeahead over product and category names.
+
+    Every word start of every folded name is stored in one sorted array, so a
+    prefix lookup is a bisect plus a scan of the matching range. Prefixes
+    matching more than SCAN_LIMIT keys ("c", "con", ...) get their top-k
+    precomputed at build time, so no lookup scans more than SCAN_LIMIT keys.
+    Popularity is units sold from order_items; categories sum their products.
+
+    Only the first lookup builds synchronously. Afterwards a catalog change or
+    an index older than CATALOG_CACHE_TTL schedules a rebuild on a background
+    thread and lookups keep using the previous index until it is swapped in.
+    """
+    SCAN_LIMIT = 128
+
+    def __init__(self, k: int = SUGGEST_MAX_LIMIT):
+        self.k = k
+        # (entries, keys, refs, top) swapped in as one tuple so readers never
+        # see a half-rebuilt index. entries are (popularity, kind, id, name),
+        # keys the sorted folded word-suffixes, refs the entry of each key and
+        # top maps heavy prefixes to their top-k entry indexes.
+        self._data = ([], [], [], {})
+        self.version = None
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+        self._building = False
+
+    def rebuild(self):
+        db = database.SessionLocal()
+        try:
+            sold = dict(
+                db.query(models.OrderItem.product_id, func.sum(models.OrderItem.quantity))
+                .filter(models.OrderItem.product_id.isnot(None))
+                .group_by(models.OrderItem.product_id)
+                .all()
+            )
+            products = db.query(models.Product.id, models.Product.name, models.Product.category_id).all()
+            categories = db.query(models.Category.id, models.Category.name).all()
+        finally:
+            db.close()
+        self.build(products, categories, sold)
+
+    def build(self, products, categories, sold):
+        """Index (id, name, category_id) products and (id, name) categories; sold maps product id -> units."""
+        category_sold = defaultdict(int)
+        entries = []
+        for product_id, name, category_id in products:
+            popularity = int(sold.get(product_id) or 0)
+            category_sold[category_id] += popularity
+            entries.append((popularity, "product", product_id, name))
+        for category_id, name in categories:
+            entries.append((category_sold[category_id], "category", category_id, name))
+
+        pairs = []
+        for i, (_, _, _, name) in enumerate(entries):
+            words = fold(name).split()
+            for w in range(len(words)):
+                pairs.append((" ".join(words[w:]), i))
+        pairs.sort()
+        keys = [key for key, _ in pairs]
+        refs = [i for _, i in pairs]
+        self._data = (entries, keys, refs, self._heavy_prefixes(entries, keys, refs))
+
+    def _rank(self, entries, indexes, limit):
+        return heapq.nsmallest(limit, set(indexes), key=lambda i: (-entries[i][0], entries[i][3]))
+
+    def _heavy_prefixes(self, entries, keys, refs):
+        # Walk the sorted keys one character deeper at a time, but only inside
+        # ranges that are still too large to scan at query time.
+        top = {}
+        stack = [(0, len(keys), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            i = lo
+            while i < hi:
+                if len(keys[i]) <= depth:
+                    i += 1
+                    continue
+                prefix = keys[i][:depth + 1]
+                j = bisect.bisect_left(keys, prefix + "\uffff", i, hi)
+                if j - i > self.SCAN_LIMIT:
+                    top[prefix] = self._rank(entries, refs[i:j], self.k)
+                    stack.append((i, j, depth + 1))
+                i = j
+        return top
+
+    def _expired(self):
+        return self.version != catalog_version.version or time.time() - self.built_at > CATALOG_CACHE_TTL
+
+    def schedule(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            while self._expired():
+                version = catalog_version.version
+                self.rebuild()
+                self.version, self.built_at = version, time.time()
+        finally:
+            with self._lock:
+                self._building = False
+
+    def refresh(self):
+        if self.version is None:
+            with self._lock:
+                if self.version is None:
+                    version = catalog_version.version
+                    self.rebuild()
+                    self.version, self.built_at = version, time.time()
+        elif self._expired():
+            self.schedule()
+
+    def suggest(self, q: str, limit: int = 10):
+        self.refresh()
+        entries, keys, refs, top = self._data
+        prefix = " ".join(fold(q).split())
+        if not prefix:
+            return []
+        limit = min(limit, self.k)
+        if prefix in top:
+            found = top[prefix][:limit]
+        else:
+            start = bisect.bisect_left(keys, prefix)
+            end = bisect.bisect_left(keys, prefix + "\uffff", lo=start)
+            found = self._rank(entries, refs[start:end], limit)
+        return [{"type": entries[i][1], "id": entries[i][2], "name": entries[i][3]} for i in found]
+
+search_index = SearchIndex()
+crud.catalog_listeners.append(search_index.on_catalog_change)
+suggest_index = SuggestIndex()
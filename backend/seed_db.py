@@ -1,6 +1,6 @@
 import json
 from database import SessionLocal, engine
-import models
+import models, crud
 
 def seed():
     db = SessionLocal()
@@ -192,7 +192,10 @@ def seed():
                 p_colors = p_data.pop("colors")
                 db_product = models.Product(**p_data)
                 db_product.colors = p_colors
+                db_product.primary_image = p_data["images"][0] if p_data.get("images") else None
                 db.add(db_product)
+                db.flush()
+                crud.sync_product_attributes(db, db_product.id, p_data.get("sizes", []))
         
         db.commit()
         print("Database seeded successfully!")
@@ -0,0 +1,98 @@
+import argparse
+import json
+import random
+import sys
+import time
+from sqlalchemy import exists, func, insert, or_, select, text
+from database import SessionLocal, engine
+from benchmark_utils import timed, add_data_args
+import models, crud
+
+# Size-filter latency before/after product_sizes: inserts --products synthetic
+# products (sizes drawn from S/M/L/XL, plus XXL on 1% of them), then times the
+# storefront's first page and the match count for a few size selections with
+# the old per-row JSON filter (JSON_CONTAINS on MySQL, json_each on SQLite)
+# and with crud.filter_products, which goes through the
+# ix_product_sizes_size_product index. Both must return the same products.
+# The synthetic products are deleted at the end (--keep to reuse them with
+# --skip-insert).
+#
+#   python size_filter_benchmark.py --products 100000
+
+NAME = "Size Benchmark"
+INSERT_BATCH = 5000
+SIZES = ("S", "M", "L", "XL")
+SELECTIONS = (["XXL"], ["XL"], ["S", "M"])
+
+def insert_products(db, products: int, seed: int):
+    rng = random.Random(seed)
+    next_id = (db.execute(select(func.max(models.Product.id))).scalar() or 0) + 1
+    started = time.perf_counter()
+    for start in range(0, products, INSERT_BATCH):
+        rows, size_rows = [], []
+        for product_id in range(next_id + start, next_id + min(start + INSERT_BATCH, products)):
+            sizes = rng.sample(SIZES, rng.randint(1, 3)) + (["XXL"] if rng.random() < 0.01 else [])
+            rows.append({
+                "id": product_id, "name": f"{NAME} {product_id}", "description": "N/A", "price": 10000.0,
+                "images": [], "sizes": sizes, "features": [], "is_new": False, "is_sale": False,
+            })
+            size_rows.extend({"product_id": product_id, "size": size} for size in sizes)
+        db.execute(insert(models.Product), rows)
+        db.execute(models.product_sizes.insert(), size_rows)
+        db.commit()
+    print(f"Inserted {products} products in {time.perf_counter() - started:.1f}s")
+
+def delete_products(db):
+    ids = select(models.Product.id).where(models.Product.name.like(f"{NAME} %"))
+    db.execute(models.product_sizes.delete().where(models.product_sizes.c.product_id.in_(ids)))
+    db.query(models.Product).filter(models.Product.name.like(f"{NAME} %")).delete(synchronize_session=False)
+    db.commit()
+
+def json_filter(query, sizes):
+    """The filter crud.filter_products used before product_sizes."""
+    if engine.dialect.name == "sqlite":
+        return query.filter(exists(
+            select(text("1")).select_from(func.json_each(models.Product.sizes).table_valued("value"))
+            .where(text("value IN ({})".format(", ".join(f"'{size}'" for size in sizes))))
+        ))
+    return query.filter(or_(*[func.json_contains(models.Product.sizes, json.dumps(size)) for size in sizes]))
+
+def indexed_filter(query, sizes):
+    return crud.filter_products(query, sizes=sizes)
+
+def run(products: int, limit: int, repeat: int, skip_insert: bool, keep: bool, seed: int):
+    db = SessionLocal()
+    ok = True
+    try:
+        if not skip_insert:
+            insert_products(db, products, seed)
+        for sizes in SELECTIONS:
+            results = {}
+            for label, apply in (("JSON", json_filter), ("index", indexed_filter)):
+                page_ms, page = timed(lambda: [
+                    row.id for row in apply(db.query(models.Product.id), sizes).order_by(models.Product.id).limit(limit)
+                ], repeat)
+                count_ms, count = timed(lambda: apply(db.query(func.count(models.Product.id)), sizes).scalar(), repeat)
+                results[label] = (page, count)
+                print(f"sizes={','.join(sizes):<5} {label:<5}: first page {page_ms:8.2f} ms   count {count_ms:8.2f} ms ({count} matches)")
+            if results["JSON"] != results["index"]:
+                ok = False
+                print(f"FAILED: sizes={','.join(sizes)} returned different products")
+        if ok:
+            print("OK: indexed size filter matches the JSON filter")
+        return ok
+    finally:
+        if not keep:
+            delete_products(db)
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size filter before/after product_sizes")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per query (median is reported)")
+    add_data_args(parser, "products")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not run(args.products, args.limit, args.repeat, args.skip_insert, args.keep, args.seed):
+        sys.exit(1)
@@ -0,0 +1,136 @@
+import gzip
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+import database, models, schemas, crud, pagination
+from cache import catalog_version, CATALOG_CACHE_TTL
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built without it
+    brotli = None
+
+# Pre-serialized catalog snapshot.
+#
+# Each product is serialized to JSON once, in full and in the ?view=summary
+# shape, and kept as bytes; the default first page of GET /api/products for
+# every category (and "Todos") and view is then assembled by joining those
+# bytes and stored together with its compressed variants. Serving the hot
+# catalog read becomes a dict lookup. Product writes mark only that product
+# dirty and a background thread re-serializes it and re-assembles the
+# affected pages.
+
+CATALOG_SNAPSHOT_ENABLED = os.getenv("CATALOG_SNAPSHOT_ENABLED", "1").lower() not in ("0", "false", "no")
+SNAPSHOT_PAGE_SIZE = 100
+VIEWS = ("full", "summary")
+
+Entry = namedtuple("Entry", ["body", "gzip", "br", "next_cursor"])
+
+class CatalogSnapshot:
+    def __init__(self, enabled: bool = True, max_age: float = CATALOG_CACHE_TTL):
+        self.enabled = enabled
+        self.max_age = max_age
+        self.entries = {}
+        self.version = None
+        self.built_at = 0.0
+        self._products = {}    # (view, product id) -> serialized JSON bytes
+        self._category_of = {} # product id -> category name
+        self._dirty = set()
+        self._full = True
+        self._lock = threading.Lock()
+        self._building = False
+
+    def get(self, category: str = None, view: str = "full"):
+        """Return the Entry for a category and view if it matches the current catalog version."""
+        if not self.enabled:
+            return None
+        key = None if category in (None, "Todos") else category
+        if self.version != catalog_version.version or time.time() - self.built_at > self.max_age:
+            self.schedule()
+            return None
+        return self.entries.get((key, view))
+
+    def on_catalog_change(self, kind: str, key=None):
+        with self._lock:
+            if kind == "product":
+                self._dirty.add(key)
+            elif kind == "category":
+                self._full = True
+        self.schedule()
+
+    def schedule(self):
+        with self._lock:
+            if self._building or not self.enabled:
+                return
+            self._building = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            while True:
+                # crud bumps catalog_version only after notifying us, so a
+                # version read here never runs ahead of the dirty ids taken
+                # with it and the stamp below can't cover stale bytes
+                with self._lock:
+                    version = catalog_version.version
+                    expired = time.time() - self.built_at > self.max_age
+                    full, dirty = self._full or expired, self._dirty
+                    self._full, self._dirty = False, set()
+                    if not full and not dirty and self.version == version:
+                        return
+                self.rebuild(full=full, dirty=dirty, version=version)
+        finally:
+            with self._lock:
+                self._building = False
+
+    def rebuild(self, full: bool = True, dirty=(), version: int = None):
+        db = database.SessionLocal()
+        try:
+            query = db.query(models.Product).options(*crud.PRODUCT_LOAD_OPTIONS)
+            if full:
+                products = query.all()
+                self._products, self._category_of = {}, {}
+            else:
+                products = query.filter(models.Product.id.in_(dirty)).all() if dirty else []
+                for product_id in dirty:
+                    for view in VIEWS:
+                        self._products.pop((view, product_id), None)
+                    self._category_of.pop(product_id, None)
+            for product in products:
+                self._products[("full", product.id)] = schemas.Product.model_validate(product).model_dump_json().encode()
+                # Same encoding as the JSONResponse the sparse path returns
+                self._products[("summary", product.id)] = json.dumps(
+                    crud.product_to_fields(product, crud.SUMMARY_FIELDS), ensure_ascii=False, separators=(",", ":")
+                ).encode()
+                self._category_of[product.id] = product.category.name if product.category else None
+            category_names = [c.name for c in db.query(models.Category).all()]
+        finally:
+            db.close()
+
+        entries = {}
+        for name in [None] + category_names:
+            ids = sorted(i for i, c in self._category_of.items() if name is None or c == name)
+            for view in VIEWS:
+                entries[(name, view)] = self._assemble(ids, view)
+        self.entries = entries
+        self.built_at = time.time()
+        self.version = version
+
+    def _assemble(self, ids, view: str):
+        page = ids[:SNAPSHOT_PAGE_SIZE]
+        body = b"[" + b",".join(self._products[(view, i)] for i in page) + b"]"
+        next_cursor = None
+        if len(ids) > SNAPSHOT_PAGE_SIZE:
+            next_cursor = pagination.encode_cursor(SimpleNamespace(id=page[-1]), crud.DEFAULT_PRODUCT_SORT, "next")
+        return Entry(
+            body=body,
+            gzip=gzip.compress(body, compresslevel=6),
+            br=brotli.compress(body) if brotli else None,
+            next_cursor=next_cursor,
+        )
+
+catalog_snapshot = CatalogSnapshot(enabled=CATALOG_SNAPSHOT_ENABLED)
+crud.catalog_listeners.append(catalog_snapshot.on_catalog_change)
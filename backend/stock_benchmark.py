@@ -0,0 +1,86 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+from database import SessionLocal
+import models, schemas, crud
+
+# Concurrency benchmark for variant stock: gives one variant --stock units,
+# fires --checkouts concurrent single-unit orders for it from --workers
+# threads and checks that exactly min(stock, checkouts) succeed, that the
+# stock never goes negative and that every accepted order has its item.
+# Orders created here are deleted and the variant's stock restored.
+#
+#   python stock_benchmark.py --stock 100 --checkouts 500 --workers 50
+
+SIZE, COLOR = "M", "Benchmark"
+
+def checkout(product_id: int, price: float):
+    db = SessionLocal()
+    try:
+        order = schemas.OrderCreate(
+            customer_name="Benchmark",
+            customer_email="benchmark@example.com",
+            customer_phone="0000000000",
+            address="N/A",
+            city="Quibdó",
+            postal_code="270001",
+            total_amount=price,
+            payment_method="cash",
+            items=[schemas.OrderItemBase(product_id=product_id, quantity=1, price=price, size=SIZE, color=COLOR)],
+        )
+        return crud.create_order(db, order).id
+    except crud.OutOfStock:
+        return None
+    finally:
+        db.close()
+
+def run(stock: int, checkouts: int, workers: int):
+    db = SessionLocal()
+    t = models.product_stock
+    variant = crud._variant_condition
+    product = db.query(models.Product.id, models.Product.price).first()
+    if product is None:
+        raise SystemExit("No products found; run seed_db.py first")
+    previous = db.execute(select(t.c.quantity).where(variant(product.id, SIZE, COLOR))).scalar()
+    db.execute(t.delete().where(variant(product.id, SIZE, COLOR)))
+    db.execute(t.insert().values(product_id=product.id, size=SIZE, color=COLOR, quantity=stock))
+    db.commit()
+
+    created, ok = [], False
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda _: checkout(product.id, product.price), range(checkouts)))
+        elapsed = time.perf_counter() - started
+        created = [order_id for order_id in results if order_id is not None]
+
+        db.expire_all()
+        remaining = db.execute(select(t.c.quantity).where(variant(product.id, SIZE, COLOR))).scalar()
+        items = db.query(models.OrderItem).filter(models.OrderItem.order_id.in_(created)).count() if created else 0
+        expected = min(stock, checkouts)
+        print(f"{checkouts} checkouts / {workers} workers in {elapsed:.2f}s: {checkouts / elapsed:.1f} checkouts/s")
+        print(f"accepted={len(created)} (expected {expected}) rejected={checkouts - len(created)} "
+              f"remaining stock={remaining} (expected {stock - expected}) items={items}")
+        ok = len(created) == expected and remaining == stock - expected and items == len(created)
+        print("OK: no overselling" if ok else "FAILED: stock and accepted orders disagree")
+    finally:
+        if created:
+            db.query(models.OrderItem).filter(models.OrderItem.order_id.in_(created)).delete(synchronize_session=False)
+            db.query(models.Order).filter(models.Order.id.in_(created)).delete(synchronize_session=False)
+        db.execute(t.delete().where(variant(product.id, SIZE, COLOR)))
+        if previous is not None:
+            db.execute(t.insert().values(product_id=product.id, size=SIZE, color=COLOR, quantity=previous))
+        db.commit()
+        db.close()
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent checkout benchmark for variant stock")
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=50)
+    args = parser.parse_args()
+    if not run(args.stock, args.checkouts, args.workers):
+        sys.exit(1)
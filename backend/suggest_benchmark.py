@@ -0,0 +1,71 @@
+import argparse
+import random
+import statistics
+import sys
+import time
+from search import SuggestIndex, SUGGEST_MAX_LIMIT, fold
+from cache import catalog_version
+
+# Lookup latency of the typeahead index (search.SuggestIndex) over --names
+# synthetic product names: builds the index in memory (no database), then
+# times --lookups suggest() calls on prefixes of 1 to 8 characters cut from
+# random names, and checks the p99 against --p99-ms.
+#
+#   python suggest_benchmark.py --names 100000 --p99-ms 1
+
+WORDS = (
+    "Conjunto", "Brasier", "Panty", "Body", "Babydoll", "Bata", "Pijama", "Corset", "Liguero", "Tanga",
+    "Encaje", "Satinado", "Seda", "Algodón", "Microfibra", "Transparente", "Bordado", "Push-up",
+    "Negro", "Rojo", "Blanco", "Nude", "Vino", "Rosa", "Lila", "Azul", "Clásico", "Romance", "Noche",
+)
+CATEGORIES = ("Conjuntos", "Brasieres", "Panties", "Bodies", "Pijamas", "Batas", "Accesorios")
+
+def make_index(names: int, seed: int):
+    rng = random.Random(seed)
+    products = [
+        (i, " ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" {i}", rng.randint(1, len(CATEGORIES)))
+        for i in range(1, names + 1)
+    ]
+    categories = list(enumerate(CATEGORIES, start=1))
+    sold = {i: rng.randint(0, 500) for i in range(1, names + 1, 3)}
+    index = SuggestIndex()
+    started = time.perf_counter()
+    index.build(products, categories, sold)
+    print(f"Built index over {names} names in {time.perf_counter() - started:.1f}s "
+          f"({len(index._data[1])} keys, {len(index._data[3])} precomputed prefixes)")
+    return index, [name for _, name, _ in products]
+
+def run(names: int, lookups: int, limit: int, p99_ms: float, seed: int):
+    index, product_names = make_index(names, seed)
+    # Mark it current so lookups never schedule a rebuild from the database
+    index.version, index.built_at = catalog_version.version, time.time()
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(lookups):
+        words = fold(rng.choice(product_names)).split()
+        suffix = " ".join(words[rng.randrange(len(words)):])
+        queries.append(suffix[:rng.randint(1, 8)])
+    samples = []
+    for q in queries:
+        started = time.perf_counter()
+        index.suggest(q, limit=limit)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{lookups} lookups (limit={limit}): p50={p50:.3f} ms p99={p99:.3f} ms max={samples[-1]:.3f} ms "
+          f"(budget p99 {p99_ms:.1f} ms)")
+    ok = p99 <= p99_ms
+    print("OK: p99 lookup latency within budget" if ok else "FAILED: p99 lookup latency over budget")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Typeahead lookup latency benchmark")
+    parser.add_argument("--names", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=10, help=f"suggestions per lookup (max {SUGGEST_MAX_LIMIT})")
+    parser.add_argument("--p99-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not run(args.names, args.lookups, args.limit, args.p99_ms, args.seed):
+        sys.exit(1)
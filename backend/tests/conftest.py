@@ -0,0 +1,52 @@
+import os
+import sys
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+# The backend modules use flat imports (import crud, models, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every read must reach the database for statement counts to mean anything;
+# tables are created below on the test engine instead of at import time.
+os.environ.update({
+    "FAST_START": "1",
+    "DB_ASYNC": "0",
+    "CATALOG_CACHE_ENABLED": "0",
+    "CATALOG_SNAPSHOT_ENABLED": "0",
+    "ORDER_COUNT_TTL": "0",
+})
+
+import database
+
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+database._engine = engine
+
+import main, models
+
+models.Base.metadata.create_all(bind=engine)
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as client:
+        client.post("/api/seed")
+        yield client
+
+@pytest.fixture
+def count_statements():
+    """Context manager yielding a one-item list holding the number of SQL statements run inside it."""
+    @contextmanager
+    def counter():
+        count = [0]
+
+        def before_cursor_execute(*args, **kwargs):
+            count[0] += 1
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield count
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return counter
@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+import database, models
+
+# PATCH /api/admin/orders/status with filters must narrow the orders it
+# touches: an empty filters object would otherwise match every order.
+
+EMAIL = "bulk-status@example.com"
+
+@pytest.fixture
+def order_ids(client):
+    db = database.SessionLocal()
+    orders = [
+        models.Order(
+            customer_name="Bulk Status", customer_email=EMAIL, customer_phone="0000000000",
+            address="N/A", city="Quibdó", postal_code="270001", total_amount=1000.0,
+            payment_method="cash", status="pending", created_at=datetime(2024, 1, 1),
+        )
+        for _ in range(3)
+    ]
+    db.add_all(orders)
+    db.commit()
+    ids = [order.id for order in orders]
+    db.close()
+    yield ids
+    db = database.SessionLocal()
+    db.query(models.Order).filter(models.Order.customer_email == EMAIL).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+def statuses(ids):
+    db = database.SessionLocal()
+    try:
+        return [status for _, status in db.query(models.Order.id, models.Order.status)
+                .filter(models.Order.id.in_(ids)).order_by(models.Order.id)]
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("filters", [{}, {"status": None, "q": None}, {"city": "", "q": ""}])
+def test_empty_filters_are_rejected(client, order_ids, filters):
+    response = client.patch("/api/admin/orders/status", json={"status": "cancelled", "filters": filters})
+    assert response.status_code == 400
+    assert statuses(order_ids) == ["pending"] * len(order_ids)
+
+def test_filters_update_matching_orders(client, order_ids):
+    response = client.patch("/api/admin/orders/status", json={"status": "paid", "filters": {"q": EMAIL}})
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == len(order_ids)
+    assert statuses(order_ids) == ["paid"] * len(order_ids)
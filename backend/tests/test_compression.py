@@ -0,0 +1,12 @@
+import pytest
+
+# Vary: Accept-Encoding on every response the compression middleware sees,
+# whether or not it ended up compressed.
+
+@pytest.mark.parametrize("accept_encoding", ["gzip", "identity"])
+@pytest.mark.parametrize("url", ["/api/categories", "/api/products?limit=100"])
+def test_vary_accept_encoding(client, url, accept_encoding):
+    response = client.get(url, headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    vary = [v.strip().lower() for v in response.headers["vary"].split(",")]
+    assert vary.count("accept-encoding") == 1
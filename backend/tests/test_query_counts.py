@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+import pytest
+import database, models
+
+# Each endpoint must run the same number of statements whatever the page
+# size: relationships are eager-loaded per page (selectinload / joinedload),
+# never lazily per row.
+
+PAGE_SIZES = (5, 20, 50)
+USER_ID = "query-count-user"
+
+@pytest.fixture(scope="module")
+def catalog(client):
+    ids = []
+    for i in range(max(PAGE_SIZES) + 1):
+        response = client.post("/api/products", json={
+            "name": f"Conjunto Encaje {i}", "description": "Encaje francés", "price": 50000 + i,
+            "images": [f"{i}-{n}.jpg" for n in range(1 + i % 4)], "sizes": ["S", "M", "L"][:1 + i % 3],
+            "category_id": 1 + i % 3, "color_ids": list(range(1, 2 + i % 5)), "features": ["Bordado"],
+            "is_new": i % 2 == 0, "is_sale": i % 3 == 0,
+        })
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+@pytest.fixture(scope="module")
+def orders(catalog):
+    db = database.SessionLocal()
+    created_at = datetime(2024, 1, 1)
+    for i in range(max(PAGE_SIZES) + 1):
+        items = [
+            models.OrderItem(product_id=catalog[(i + n) % len(catalog)], quantity=1, price=50000, size="M")
+            for n in range(1 + i % 3)
+        ]
+        db.add(models.Order(
+            customer_name="Query Count", customer_email="query-count@example.com", customer_phone="0000000000",
+            address="N/A", city="Quibdó", postal_code="270001", total_amount=50000.0 * len(items),
+            payment_method="cash", status="pending", user_id=USER_ID,
+            created_at=created_at + timedelta(hours=i), items=items,
+        ))
+    db.commit()
+    db.close()
+
+def statements_by_page_size(client, count_statements, url):
+    counts = {}
+    for size in PAGE_SIZES:
+        with count_statements() as count:
+            response = client.get(url.format(limit=size))
+        assert response.status_code == 200, response.text
+        assert len(response.json()) == size
+        counts[size] = count[0]
+    return counts
+
+@pytest.mark.parametrize("url", [
+    "/api/products?limit={limit}",
+    "/api/products?limit={limit}&view=summary",
+    "/api/products?limit={limit}&sort=price-asc&color_ids=1",
+    "/api/products?limit={limit}&skip=1",
+])
+def test_product_list(client, count_statements, catalog, url):
+    counts = statements_by_page_size(client, count_statements, url)
+    assert len(set(counts.values())) == 1, counts
+
+def test_product_detail(client, count_statements, catalog):
+    # Products with 1 to 5 colors and 1 to 4 images
+    counts = {}
+    for product_id in catalog[:5]:
+        with count_statements() as count:
+            response = client.get(f"/api/products/{product_id}")
+        assert response.status_code == 200, response.text
+        counts[product_id] = count[0]
+    assert len(set(counts.values())) == 1, counts
+
+def test_user_orders(client, count_statements, orders):
+    counts = statements_by_page_size(client, count_statements, f"/api/orders/user/{USER_ID}?limit={{limit}}")
+    assert len(set(counts.values())) == 1, counts
+
+@pytest.mark.parametrize("url", [
+    "/api/admin/orders?limit={limit}",
+    "/api/admin/orders?limit={limit}&status=pending",
+    "/api/admin/orders?limit={limit}&skip=1",
+])
+def test_admin_orders(client, count_statements, orders, url):
+    counts = statements_by_page_size(client, count_statements, url)
+    assert len(set(counts.values())) == 1, counts
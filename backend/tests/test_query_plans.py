@@ -0,0 +1,74 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import event
+from conftest import engine
+import database, crud, pagination
+
+# The order, visitor and user lookups must walk an index that returns rows
+# already in sort order. Each case runs the real crud function, takes the
+# first statement it sent and checks SQLite's EXPLAIN QUERY PLAN for it: the
+# expected index is used, filtered and cursor queries SEARCH it (seek to a
+# range) rather than SCAN it from the start, and no temporary B-tree sorts
+# the result.
+
+def order_cursor():
+    row = SimpleNamespace(created_at=datetime(2024, 1, 1), id=10)
+    return pagination.encode_cursor(row, crud.ORDER_SORT, "next")
+
+def user_cursor():
+    row = SimpleNamespace(created_at=datetime(2024, 1, 1), id=10)
+    return pagination.encode_cursor(row, crud.USER_SORT, "next")
+
+CASES = {
+    "admin order listing": (lambda db: crud.get_all_orders_page(db, limit=20), "SCAN", "ix_orders_created_at_id"),
+    "admin order listing, deep page": (
+        lambda db: crud.get_all_orders_page(db, cursor=order_cursor(), limit=20), "SEARCH", "ix_orders_created_at_id"
+    ),
+    "admin order listing, offset": (lambda db: crud.get_all_orders(db, skip=40, limit=20), "SCAN", "ix_orders_created_at_id"),
+    "admin status filter": (
+        lambda db: crud.get_all_orders_page(db, limit=20, status="pending"), "SEARCH", "ix_orders_status_created_at"
+    ),
+    "admin payment filter": (
+        lambda db: crud.get_all_orders_page(db, limit=20, payment_method="cash"), "SEARCH", "ix_orders_payment_created_at"
+    ),
+    "admin city filter": (lambda db: crud.get_all_orders_page(db, limit=20, city="Quibdó"), "SEARCH", "ix_orders_city_created_at"),
+    "admin date range": (
+        lambda db: crud.get_all_orders_page(db, limit=20, date_from=date(2024, 1, 1), date_to=date(2024, 1, 31)),
+        "SEARCH", "ix_orders_created_at_id",
+    ),
+    "user order history": (
+        lambda db: crud.get_user_orders_page(db, "plan-user", cursor=order_cursor(), limit=20),
+        "SEARCH", "ix_orders_user_created_at",
+    ),
+    "daily visit dedupe": (lambda db: crud.record_visit(db, "127.0.0.1"), "SEARCH", "ix_visitors_ip_date"),
+    "admin user listing": (lambda db: crud.get_all_users_page(db, cursor=user_cursor(), limit=20), "SEARCH", "ix_users_created_at_id"),
+}
+
+def first_statement(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    db = database.SessionLocal()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.rollback()
+        db.close()
+    return statements[0]
+
+def query_plan(statement, parameters):
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+@pytest.mark.parametrize("name", CASES)
+def test_query_uses_index(name):
+    fn, access, index = CASES[name]
+    plan = query_plan(*first_statement(fn))
+    assert any(step.startswith(access) and (f"USING INDEX {index}" in step or f"USING COVERING INDEX {index}" in step)
+               for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
@@ -0,0 +1,42 @@
+import pytest
+from cache import catalog_version
+from snapshot import catalog_snapshot
+
+# The default first page is served from the catalog snapshot (no queries);
+# any filter that was given, including false and 0, must skip it.
+
+@pytest.fixture
+def snapshot(client):
+    for i in range(4):
+        response = client.post("/api/products", json={
+            "name": f"Body Satinado {i}", "description": "Satín", "price": 40000 + i, "images": [], "sizes": ["M"],
+            "category_id": 1, "color_ids": [1], "features": [], "is_new": i % 2 == 0, "is_sale": i % 2 == 1,
+        })
+        assert response.status_code == 200, response.text
+    # The suite runs with CATALOG_SNAPSHOT_ENABLED=0; build it synchronously here
+    catalog_snapshot.enabled = True
+    catalog_snapshot.rebuild(full=True, version=catalog_version.version)
+    yield
+    catalog_snapshot.enabled = False
+
+def test_default_page_is_served_from_snapshot(client, count_statements, snapshot):
+    with count_statements() as count:
+        response = client.get("/api/products")
+    assert response.status_code == 200
+    assert count[0] == 0
+
+@pytest.mark.parametrize("query, keep", [
+    ("is_new=false", lambda p: not p["is_new"]),
+    ("is_sale=false", lambda p: not p["is_sale"]),
+    ("min_price=0", lambda p: p["price"] >= 0),
+    ("max_price=0", lambda p: p["price"] <= 0),
+])
+def test_falsy_filters_skip_snapshot(client, count_statements, snapshot, query, keep):
+    with count_statements() as count:
+        response = client.get(f"/api/products?{query}")
+    assert response.status_code == 200
+    assert count[0] > 0
+    products = response.json()
+    assert all(keep(p) for p in products)
+    if query == "max_price=0":
+        assert products == []
@@ -1,8 +1,8 @@
-import { useState, useRef, useEffect, useMemo } from "react";
+import { useState, useRef, useEffect } from "react";
 import { Link } from "react-router-dom";
 import { Search, X } from "lucide-react";
 import { useQuery } from "@tanstack/react-query";
-import { getProducts } from "@/services/apiService";
+import { searchProducts } from "@/services/apiService";
 
 interface SearchBarProps {
   isOpen: boolean;
@@ -13,28 +13,13 @@ const SearchBar = ({ isOpen, onClose }: SearchBarProps) => {
   const [query, setQuery] = useState("");
   const inputRef = useRef<HTMLInputElement>(null);
 
-  const { data: products = [] } = useQuery({
-    queryKey: ["products", "search"],
-    queryFn: () => getProducts(),
-    enabled: isOpen,
+  const { data: filteredProducts = [] } = useQuery({
+    queryKey: ["products", "search", query],
+    queryFn: () => searchProducts(query),
+    enabled: isOpen && query.length >= 2,
+    placeholderData: (previous) => previous,
   });
 
-  const filteredProducts = useMemo(() =>
-    query.length >= 2
-      ? products.filter(
-        (product) => {
-          if (!product.category) return product.name.toLowerCase().includes(query.toLowerCase());
-          const categoryProp = product.category as any;
-          const catName = typeof categoryProp === 'object' ? categoryProp.name : categoryProp;
-          return product.name.toLowerCase().includes(query.toLowerCase()) ||
-            catName?.toLowerCase().includes(query.toLowerCase()) ||
-            product.description.toLowerCase().includes(query.toLowerCase())
-        }
-      ).slice(0, 6)
-      : [],
-    [query, products]
-  );
-
   useEffect(() => {
     if (isOpen && inputRef.current) {
       inputRef.current.focus();
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate, Link } from "react-router-dom";
 import { ArrowLeft, CreditCard, Truck, Check, Package } from "lucide-react";
 import { Button } from "@/components/ui/button";
@@ -38,7 +38,7 @@ const Checkout = () => {
     if (isAuthenticated && user?.id) {
       const loadPreviousData = async () => {
         try {
-          const orders = await getUserOrders(user.id);
+          const orders = await getUserOrders(user.id, 1);
           if (orders && orders.length > 0) {
             const lastOrder = orders[0];
             setShippingData({
@@ -71,6 +71,10 @@ const Checkout = () => {
     cvv: "",
   });
 
+  // Idempotency-Key reused while the order payload is unchanged, so retrying
+  // after a network error can't create the same order twice
+  const orderAttempt = useRef<{ payload: string; key: string } | null>(null);
+
   const shippingCost = totalPrice >= 100000 ? 0 : 15000;
   const finalTotal = totalPrice + shippingCost;
 
@@ -128,7 +132,11 @@ const Checkout = () => {
         }))
       };
 
-      const order = await createOrder(orderData);
+      const payload = JSON.stringify(orderData);
+      if (orderAttempt.current?.payload !== payload) {
+        orderAttempt.current = { payload, key: crypto.randomUUID() };
+      }
+      const order = await createOrder(orderData, orderAttempt.current.key);
 
       if (paymentData.method === "wompi") {
         // Wompi Checkout integration
@@ -144,7 +152,7 @@ const Checkout = () => {
 
         const checkout = new (window as any).WidgetCheckout({
           currency: 'COP',
-          amountInCents: Math.round(orderData.total_amount * 100),
+          amountInCents: Math.round(order.total_amount * 100),
           reference: `ORD-${order.id}-${Date.now()}`,
           publicKey: 'pub_test_Q5yS9j9psjt7H0vCba8b9R4P3fW26n4O', // Test Key
           redirectUrl: window.location.origin + '/productos' // For testing
@@ -174,8 +182,20 @@ const Checkout = () => {
           : "Pedido registrado con éxito."
       });
 
-    } catch (error) {
+    } catch (error: any) {
       console.error(error);
+      if (error?.response?.status === 409) {
+        // Prices changed since the cart was filled, or a variant ran out of stock
+        const outOfStock = Boolean(error.response.data?.detail?.items);
+        toast({
+          title: outOfStock ? "Sin stock suficiente" : "Precios actualizados",
+          description: outOfStock
+            ? "Algunos productos de tu carrito ya no tienen unidades suficientes en esa talla o color."
+            : "Algunos precios de tu carrito cambiaron. Revisa tu pedido antes de continuar.",
+          variant: "destructive",
+        });
+        return;
+      }
       toast({
         title: "Error",
         description: "No se pudo procesar el pedido. Inténtalo de nuevo.",
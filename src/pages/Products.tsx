@@ -20,7 +20,7 @@ import {
   CollapsibleTrigger,
 } from "@/components/ui/collapsible";
 import { useQuery } from "@tanstack/react-query";
-import { getProducts, getCategories, getColors } from "@/services/apiService";
+import { getProducts, getCategories, getColors, ProductFilters } from "@/services/apiService";
 
 interface ProductFiltersProps {
   selectedCategory: string;
@@ -233,11 +233,6 @@ const Products = () => {
   const maxPrice = parseInt(searchParams.get("max") || "500000");
   const sortBy = searchParams.get("sort") || "default";
 
-  const { data: products = [], isLoading: isLoadingProducts } = useQuery({
-    queryKey: ["products", selectedCategory],
-    queryFn: () => getProducts(selectedCategory),
-  });
-
   const { data: categories = ["Todos"] } = useQuery({
     queryKey: ["categories"],
     queryFn: getCategories,
@@ -249,6 +244,31 @@ const Products = () => {
     queryFn: getColors,
   });
 
+  // Filtering and sorting run on the server; the URL keeps color names for readability
+  const selectedColorIds = useMemo(
+    () => colorFilters.filter((c: any) => selectedColors.includes(c.name)).map((c: any) => c.id),
+    [colorFilters, selectedColors]
+  );
+
+  const productFilters: ProductFilters = {
+    color_ids: selectedColorIds,
+    sizes: selectedSizes,
+    // The slider's ends mean "no bound"; leaving them out keeps the default
+    // listing on the server's pre-serialized snapshot
+    min_price: minPrice > 0 ? minPrice : undefined,
+    max_price: maxPrice < 500000 ? maxPrice : undefined,
+    is_new: selectedFilter === "new" ? true : undefined,
+    is_sale: selectedFilter === "sale" ? true : undefined,
+    sort: sortBy === "default" ? undefined : sortBy,
+    view: "summary",
+  };
+
+  const { data: products = [], isLoading: isLoadingProducts } = useQuery({
+    queryKey: ["products", selectedCategory, productFilters],
+    queryFn: () => getProducts(selectedCategory, productFilters),
+    enabled: selectedColors.length === 0 || colorFilters.length > 0,
+  });
+
   const allSizes = ["XS", "S", "M", "L", "XL", "2XL", "3XL", "32B", "34B", "36B", "38B", "Única"];
 
   const updateFilters = (updates: Record<string, string | string[] | null>) => {
@@ -277,60 +297,7 @@ const Products = () => {
     setSearchParams({});
   };
 
-  const filteredProducts = useMemo(() => {
-    let result = [...products];
-
-    // Category filter handled by API if selectedCategory !== "Todos"
-    // However, if we want client-side fallback or refined filtering:
-    if (selectedCategory && selectedCategory !== "Todos") {
-      result = result.filter((p) => {
-        const cat = p.category;
-        const catName = typeof cat === 'object' ? (cat as any).name : cat;
-        return catName === selectedCategory;
-      });
-    }
-
-    // Color filter
-    if (selectedColors.length > 0) {
-      result = result.filter((p) =>
-        Array.isArray(p.colors) && p.colors.some((c) => selectedColors.includes(c.name))
-      );
-    }
-
-    // Size filter
-    if (selectedSizes.length > 0) {
-      result = result.filter((p) =>
-        Array.isArray(p.sizes) && p.sizes.some((s) => selectedSizes.includes(s))
-      );
-    }
-
-    // Filter by type (New/Sale)
-    if (selectedFilter === "new") {
-      result = result.filter(p => p.isNew);
-    } else if (selectedFilter === "sale") {
-      result = result.filter(p => p.isSale);
-    }
-
-    // Price filter
-    result = result.filter(
-      (p) => p.price >= minPrice && p.price <= maxPrice
-    );
-
-    // Sort
-    switch (sortBy) {
-      case "price-asc":
-        result.sort((a, b) => a.price - b.price);
-        break;
-      case "price-desc":
-        result.sort((a, b) => b.price - a.price);
-        break;
-      case "newest":
-        result.sort((a, b) => (b.isNew ? 1 : 0) - (a.isNew ? 1 : 0));
-        break;
-    }
-
-    return result;
-  }, [products, selectedCategory, selectedFilter, selectedColors, selectedSizes, minPrice, maxPrice, sortBy]);
+  const filteredProducts = products;
 
   const activeFiltersCount =
     (selectedCategory !== "Todos" ? 1 : 0) +
@@ -8,7 +8,7 @@ import { useWishlist } from "@/contexts/WishlistContext";
 import { toast } from "@/hooks/use-toast";
 import Header from "@/components/Header";
 import Footer from "@/components/Footer";
-import { getUserOrders } from "@/services/apiService";
+import { getUserOrdersPage } from "@/services/apiService";
 import { Separator } from "@/components/ui/separator";
 
 const Profile = () => {
@@ -19,6 +19,8 @@ const Profile = () => {
   const [editName, setEditName] = useState(user?.name || "");
   const [orders, setOrders] = useState<any[]>([]);
   const [loadingOrders, setLoadingOrders] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (isAuthenticated && user?.id) {
@@ -29,8 +31,9 @@ const Profile = () => {
   const fetchOrders = async () => {
     try {
       setLoadingOrders(true);
-      const data = await getUserOrders(user!.id);
-      setOrders(data);
+      const page = await getUserOrdersPage(user!.id);
+      setOrders(page.orders);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Error fetching orders:", error);
     } finally {
@@ -38,6 +41,20 @@ const Profile = () => {
     }
   };
 
+  const fetchMoreOrders = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await getUserOrdersPage(user!.id, nextCursor);
+      setOrders((current) => [...current, ...page.orders]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error fetching orders:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (!isAuthenticated) {
     navigate("/auth");
     return null;
@@ -186,6 +203,13 @@ const Profile = () => {
                           </div>
                         </div>
                       ))}
+                      {nextCursor && (
+                        <div className="flex justify-center">
+                          <Button variant="outline" onClick={fetchMoreOrders} disabled={loadingMore}>
+                            {loadingMore ? "Cargando..." : "Ver más pedidos"}
+                          </Button>
+                        </div>
+                      )}
                     </div>
                   ) : (
                     <div className="text-center py-12">
@@ -20,19 +20,41 @@ import {
     DropdownMenuItem,
     DropdownMenuTrigger
 } from "@/components/ui/dropdown-menu";
+import {
+    Select,
+    SelectContent,
+    SelectItem,
+    SelectTrigger,
+    SelectValue,
+} from "@/components/ui/select";
 import { toast } from "@/hooks/use-toast";
-import { getAdminOrders, updateOrderStatus } from "@/services/apiService";
+import { Checkbox } from "@/components/ui/checkbox";
+import { getAdminOrders, getAdminOrdersExportUrl, updateOrderStatus, bulkUpdateOrderStatus, AdminOrderFilters } from "@/services/apiService";
+
+const ALL = "all";
 
 const AdminOrders = () => {
     const [orders, setOrders] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState("");
+    const [showFilters, setShowFilters] = useState(false);
+    const [filters, setFilters] = useState<AdminOrderFilters>({});
+    const [total, setTotal] = useState(0);
+    const [cursor, setCursor] = useState<string | undefined>(undefined);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [prevCursor, setPrevCursor] = useState<string | null>(null);
+    const [selected, setSelected] = useState<number[]>([]);
 
-    const fetchOrders = async () => {
+    const fetchOrders = async (pageCursor?: string) => {
         try {
             setLoading(true);
-            const data = await getAdminOrders();
-            setOrders(data);
+            const page = await getAdminOrders({ ...filters, q: searchTerm.trim() }, pageCursor);
+            setOrders(page.orders);
+            setSelected([]);
+            setTotal(page.total);
+            setCursor(pageCursor);
+            setNextCursor(page.nextCursor);
+            setPrevCursor(page.prevCursor);
         } catch (error) {
             console.error("Error fetching orders:", error);
             toast({
@@ -45,9 +67,15 @@ const AdminOrders = () => {
         }
     };
 
+    // Search and filters run on the server, so wait until the user stops typing
     useEffect(() => {
-        fetchOrders();
-    }, []);
+        const timer = setTimeout(() => fetchOrders(), 300);
+        return () => clearTimeout(timer);
+    }, [filters, searchTerm]);
+
+    const setFilter = (key: keyof AdminOrderFilters, value: string) => {
+        setFilters((current) => ({ ...current, [key]: value === ALL ? undefined : value }));
+    };
 
     const handleStatusUpdate = async (orderId: number, newStatus: string) => {
         try {
@@ -56,7 +84,7 @@ const AdminOrders = () => {
                 title: "Éxito",
                 description: `Estado del pedido #${orderId} actualizado a ${newStatus}.`,
             });
-            fetchOrders(); // Refresh table
+            fetchOrders(cursor); // Refresh table
         } catch (error) {
             console.error("Error updating status:", error);
             toast({
@@ -67,6 +95,30 @@ const AdminOrders = () => {
         }
     };
 
+    const handleBulkStatusUpdate = async (newStatus: string) => {
+        try {
+            const { updated, results } = await bulkUpdateOrderStatus(newStatus, { ids: selected });
+            const skipped = results.length - updated;
+            toast({
+                title: "Éxito",
+                description: `${updated} pedidos actualizados a ${newStatus}` +
+                    (skipped ? `; ${skipped} no admiten ese cambio o ya lo tenían.` : "."),
+            });
+            fetchOrders(cursor);
+        } catch (error) {
+            console.error("Error updating status:", error);
+            toast({
+                title: "Error",
+                description: "No se pudo actualizar el estado de los pedidos.",
+                variant: "destructive",
+            });
+        }
+    };
+
+    const toggleSelected = (orderId: number, checked: boolean) => {
+        setSelected((current) => checked ? [...current, orderId] : current.filter((id) => id !== orderId));
+    };
+
     const getStatusBadge = (status: string) => {
         switch (status.toLowerCase()) {
             case "pending":
@@ -84,12 +136,6 @@ const AdminOrders = () => {
         }
     };
 
-    const filteredOrders = orders.filter(order =>
-        order.id.toString().includes(searchTerm) ||
-        order.customer_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        order.customer_email.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-
     return (
         <AdminLayout>
             <div className="space-y-8 animate-fadeIn">
@@ -99,12 +145,12 @@ const AdminOrders = () => {
                         <p className="text-muted-foreground mt-1">Gestiona las compras de tus clientes.</p>
                     </div>
                     <div className="flex gap-2">
-                        <Button variant="outline" className="gap-2">
+                        <Button variant="outline" className="gap-2" onClick={() => setShowFilters(!showFilters)}>
                             <Filter size={18} />
                             Filtros
                         </Button>
-                        <Button className="bg-primary hover:bg-primary/90 text-primary-foreground">
-                            Exportar CSV
+                        <Button asChild className="bg-primary hover:bg-primary/90 text-primary-foreground">
+                            <a href={getAdminOrdersExportUrl({ ...filters, q: searchTerm.trim() })} download>Exportar CSV</a>
                         </Button>
                     </div>
                 </div>
@@ -121,12 +167,88 @@ const AdminOrders = () => {
                                 onChange={(e) => setSearchTerm(e.target.value)}
                             />
                         </div>
+                        {selected.length > 0 && (
+                            <div className="flex items-center gap-3 mt-4 text-sm">
+                                <span className="text-muted-foreground">{selected.length} seleccionados</span>
+                                <DropdownMenu>
+                                    <DropdownMenuTrigger asChild>
+                                        <Button variant="outline" size="sm">Cambiar estado</Button>
+                                    </DropdownMenuTrigger>
+                                    <DropdownMenuContent align="start" className="w-40">
+                                        <DropdownMenuItem className="gap-2 text-blue-600" onClick={() => handleBulkStatusUpdate('paid')}>
+                                            <CheckCircle2 size={14} /> Marcar Pagado
+                                        </DropdownMenuItem>
+                                        <DropdownMenuItem className="gap-2 text-purple-600" onClick={() => handleBulkStatusUpdate('shipped')}>
+                                            <Truck size={14} /> Marcar Enviado
+                                        </DropdownMenuItem>
+                                        <DropdownMenuItem className="gap-2 text-green-600" onClick={() => handleBulkStatusUpdate('delivered')}>
+                                            <CheckCircle2 size={14} /> Marcar Entregado
+                                        </DropdownMenuItem>
+                                        <DropdownMenuItem className="gap-2 text-red-600" onClick={() => handleBulkStatusUpdate('cancelled')}>
+                                            <XCircle size={14} /> Cancelar
+                                        </DropdownMenuItem>
+                                    </DropdownMenuContent>
+                                </DropdownMenu>
+                            </div>
+                        )}
+                        {showFilters && (
+                            <div className="grid grid-cols-2 md:grid-cols-5 gap-3 mt-4">
+                                <Select value={filters.status ?? ALL} onValueChange={(val) => setFilter('status', val)}>
+                                    <SelectTrigger>
+                                        <SelectValue placeholder="Estado" />
+                                    </SelectTrigger>
+                                    <SelectContent>
+                                        <SelectItem value={ALL}>Todos los estados</SelectItem>
+                                        <SelectItem value="pending">Pendiente</SelectItem>
+                                        <SelectItem value="paid">Pagado</SelectItem>
+                                        <SelectItem value="shipped">Enviado</SelectItem>
+                                        <SelectItem value="delivered">Entregado</SelectItem>
+                                        <SelectItem value="cancelled">Cancelado</SelectItem>
+                                    </SelectContent>
+                                </Select>
+                                <Select value={filters.payment_method ?? ALL} onValueChange={(val) => setFilter('payment_method', val)}>
+                                    <SelectTrigger>
+                                        <SelectValue placeholder="Método de pago" />
+                                    </SelectTrigger>
+                                    <SelectContent>
+                                        <SelectItem value={ALL}>Todos los pagos</SelectItem>
+                                        <SelectItem value="wompi">Wompi</SelectItem>
+                                        <SelectItem value="cash">Efectivo</SelectItem>
+                                        <SelectItem value="cod">Contra entrega</SelectItem>
+                                    </SelectContent>
+                                </Select>
+                                <Input
+                                    type="date"
+                                    aria-label="Desde"
+                                    value={filters.date_from ?? ""}
+                                    onChange={(e) => setFilter('date_from', e.target.value)}
+                                />
+                                <Input
+                                    type="date"
+                                    aria-label="Hasta"
+                                    value={filters.date_to ?? ""}
+                                    onChange={(e) => setFilter('date_to', e.target.value)}
+                                />
+                                <Input
+                                    placeholder="Ciudad"
+                                    value={filters.city ?? ""}
+                                    onChange={(e) => setFilter('city', e.target.value)}
+                                />
+                            </div>
+                        )}
                     </div>
 
                     <div className="overflow-x-auto">
                         <table className="w-full text-sm text-left">
                             <thead className="text-xs uppercase bg-muted/50 text-muted-foreground border-b border-border">
                                 <tr>
+                                    <th className="pl-6 py-4 w-4">
+                                        <Checkbox
+                                            aria-label="Seleccionar todos"
+                                            checked={orders.length > 0 && selected.length === orders.length}
+                                            onCheckedChange={(checked) => setSelected(checked ? orders.map((order) => order.id) : [])}
+                                        />
+                                    </th>
                                     <th className="px-6 py-4 font-semibold italic">ID</th>
                                     <th className="px-6 py-4 font-semibold">Cliente</th>
                                     <th className="px-6 py-4 font-semibold">Fecha</th>
@@ -138,19 +260,26 @@ const AdminOrders = () => {
                             <tbody className="divide-y divide-border">
                                 {loading ? (
                                     <tr>
-                                        <td colSpan={6} className="px-6 py-12 text-center text-muted-foreground italic">
+                                        <td colSpan={7} className="px-6 py-12 text-center text-muted-foreground italic">
                                             Cargando pedidos...
                                         </td>
                                     </tr>
-                                ) : filteredOrders.length === 0 ? (
+                                ) : orders.length === 0 ? (
                                     <tr>
-                                        <td colSpan={6} className="px-6 py-12 text-center text-muted-foreground italic">
+                                        <td colSpan={7} className="px-6 py-12 text-center text-muted-foreground italic">
                                             No se encontraron pedidos.
                                         </td>
                                     </tr>
                                 ) : (
-                                    filteredOrders.map((order) => (
+                                    orders.map((order) => (
                                         <tr key={order.id} className="hover:bg-muted/30 transition-colors">
+                                            <td className="pl-6 py-4">
+                                                <Checkbox
+                                                    aria-label={`Seleccionar pedido #${order.id}`}
+                                                    checked={selected.includes(order.id)}
+                                                    onCheckedChange={(checked) => toggleSelected(order.id, checked === true)}
+                                                />
+                                            </td>
                                             <td className="px-6 py-4 font-medium text-foreground">#{order.id}</td>
                                             <td className="px-6 py-4">
                                                 <div className="font-medium">{order.customer_name}</div>
@@ -211,12 +340,12 @@ const AdminOrders = () => {
                     </div>
 
                     <div className="p-4 border-t border-border flex items-center justify-between text-muted-foreground italic">
-                        <p>Mostrando {filteredOrders.length} pedidos</p>
+                        <p>Mostrando {orders.length} de {total} pedidos</p>
                         <div className="flex gap-2">
-                            <Button variant="outline" size="icon" disabled className="h-8 w-8">
+                            <Button variant="outline" size="icon" disabled={!prevCursor || loading} className="h-8 w-8" onClick={() => fetchOrders(prevCursor!)}>
                                 <ChevronLeft size={16} />
                             </Button>
-                            <Button variant="outline" size="icon" disabled className="h-8 w-8">
+                            <Button variant="outline" size="icon" disabled={!nextCursor || loading} className="h-8 w-8" onClick={() => fetchOrders(nextCursor!)}>
                                 <ChevronRight size={16} />
                             </Button>
                         </div>
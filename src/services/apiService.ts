@@ -8,11 +8,25 @@ export const api = axios.create({
     baseURL: API_URL,
 });
 
-export const getProducts = async (category?: string) => {
-    const params = category && category !== "Todos" ? { category } : {};
-    const response = await api.get("products", { params });
+export interface ProductFilters {
+    color_ids?: number[];
+    sizes?: string[];
+    min_price?: number;
+    max_price?: number;
+    is_new?: boolean;
+    is_sale?: boolean;
+    sort?: string;
+    view?: "full" | "summary";
+}
+
+export const getProducts = async (category?: string, filters: ProductFilters = {}) => {
+    const params = category && category !== "Todos" ? { category, ...filters } : { ...filters };
+    // FastAPI expects repeated keys (color_ids=1&color_ids=2), not color_ids[]=1
+    const response = await api.get("products", { params, paramsSerializer: { indexes: null } });
     return response.data.map(p => ({
         ...p,
+        // view=summary only sends the first image
+        images: p.images ?? (p.primary_image ? [p.primary_image] : []),
         originalPrice: p.original_price,
         isNew: p.is_new,
         isSale: p.is_sale,
@@ -32,6 +46,29 @@ export const getProductById = async (id: string | number) => {
     } as Product;
 };
 
+export const getProductsByIds = async (ids: Array<string | number>) => {
+    if (ids.length === 0) return [] as Product[];
+    const response = await api.get("products", { params: { ids: ids.join(",") } });
+    return response.data.map(p => ({
+        ...p,
+        originalPrice: p.original_price,
+        isNew: p.is_new,
+        isSale: p.is_sale,
+        category: typeof p.category === 'object' ? p.category.name : p.category
+    })) as Product[];
+};
+
+export const searchProducts = async (q: string, limit = 6) => {
+    const response = await api.get("products/search", { params: { q, limit } });
+    return response.data.map(p => ({
+        ...p,
+        originalPrice: p.original_price,
+        isNew: p.is_new,
+        isSale: p.is_sale,
+        category: typeof p.category === 'object' ? p.category.name : p.category
+    })) as Product[];
+};
+
 export const getCategories = async () => {
     const response = await api.get("categories");
     return response.data;
@@ -57,14 +94,25 @@ export const getColors = async () => {
     return response.data;
 };
 
-export const createOrder = async (orderData: any) => {
-    const response = await api.post("orders", orderData);
+export const createOrder = async (orderData: any, idempotencyKey?: string) => {
+    const response = await api.post("orders", orderData, {
+        headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
+    });
     return response.data;
 };
 
-export const getUserOrders = async (userId: string | number) => {
-    const response = await api.get(`orders/user/${userId}`);
-    return response.data;
+export const getUserOrders = async (userId: string | number, limit?: number) => {
+    const { orders } = await getUserOrdersPage(userId, undefined, limit);
+    return orders;
+};
+
+// Newest first; pass nextCursor back to get the following page (null on the last one)
+export const getUserOrdersPage = async (userId: string | number, cursor?: string, limit?: number) => {
+    const response = await api.get(`orders/user/${userId}`, { params: { cursor, limit } });
+    return {
+        orders: response.data,
+        nextCursor: (response.headers["x-next-cursor"] as string | undefined) ?? null,
+    };
 };
 
 export const getOrderById = async (orderId: string | number, email: string) => {
@@ -73,9 +121,31 @@ export const getOrderById = async (orderId: string | number, email: string) => {
 };
 
 // Admin Endpoints
-export const getAdminOrders = async () => {
-    const response = await api.get("admin/orders");
-    return response.data;
+export interface AdminOrderFilters {
+    status?: string;
+    payment_method?: string;
+    date_from?: string; // YYYY-MM-DD, inclusive
+    date_to?: string;
+    city?: string;
+    q?: string; // ID, or prefix of the customer's email or name
+}
+
+export const getAdminOrders = async (filters: AdminOrderFilters = {}, cursor?: string, limit = 50) => {
+    // Unset filters are left out rather than sent empty
+    const params = Object.fromEntries(Object.entries({ ...filters, cursor, limit }).filter(([, v]) => v !== undefined && v !== ""));
+    const response = await api.get("admin/orders", { params });
+    return {
+        orders: response.data,
+        total: Number(response.headers["x-total-count"] ?? response.data.length),
+        nextCursor: (response.headers["x-next-cursor"] as string | undefined) ?? null,
+        prevCursor: (response.headers["x-prev-cursor"] as string | undefined) ?? null,
+    };
+};
+
+// Streamed by the server; open it directly so the browser downloads it as it arrives
+export const getAdminOrdersExportUrl = (filters: AdminOrderFilters = {}, format: "csv" | "ndjson" = "csv") => {
+    const params = Object.fromEntries(Object.entries({ ...filters, format }).filter(([, v]) => v !== undefined && v !== ""));
+    return api.getUri({ url: "admin/orders/export", params });
 };
 
 export const getAdminUsers = async () => {
@@ -88,6 +158,13 @@ export const updateOrderStatus = async (orderId: number, status: string) => {
     return response.data;
 };
 
+// One request for many orders; the response has a result per order
+// (updated, unchanged, invalid_transition or not_found)
+export const bulkUpdateOrderStatus = async (status: string, target: { ids: number[] } | { filters: AdminOrderFilters }) => {
+    const response = await api.patch("admin/orders/status", { status, ...target });
+    return response.data;
+};
+
 export const updateProduct = async (productId: number, productData: any) => {
     const response = await api.put(`admin/products/${productId}`, productData);
     return response.data;